@@ -0,0 +1,628 @@
+import os
+import re
+import sys
+import csv
+import json
+import gzip
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.server
+import html as html_module
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from scrapper import AdvancedKickstarterDownloader, extract_audio, find_ffmpeg, peak_rss_bytes
+
+
+def make_project_page(project_id, title, video_url=None, video_id=None, padding_kb=300):
+    """Build a synthetic Kickstarter project page with a realistic window.current_project blob"""
+    rng = random.Random(project_id)
+
+    video = None
+    if video_url:
+        video = {
+            'id': video_id or rng.randint(100000, 999999),
+            'status': 'successful',
+            'hls': video_url.rsplit('.', 1)[0] + '.m3u8',
+            'high': video_url,
+            'high_type': 'video/mp4; codecs="avc1.64001E, mp4a.40.2"',
+            'base': video_url.replace('_high', '_base'),
+            'base_type': 'video/mp4; codecs="avc1.42E01E, mp4a.40.2"',
+            'tracks': '[]',
+            'width': 1280,
+            'height': 720,
+            'frame': f'https://ksr-ugc.imgix.net/assets/{project_id}/frame.jpg',
+        }
+
+    project = {
+        'id': project_id,
+        'name': title,
+        'blurb': 'A synthetic project used for offline benchmarking. ' * 3,
+        'goal': rng.randint(1000, 100000),
+        'pledged': rng.randint(0, 200000),
+        'state': 'successful',
+        'currency': 'USD',
+        'photo': {size: f'https://ksr-ugc.imgix.net/assets/{project_id}/{size}.jpg'
+                  for size in ('full', 'ed', 'med', 'little', 'small', 'thumb', '1024x576', '1536x864')},
+        'creator': {'id': rng.randint(1, 10 ** 9), 'name': 'Bench Creator',
+                    'avatar': {'thumb': 'https://ksr-ugc.imgix.net/avatar.jpg'}},
+        'rewards': [
+            {'id': i, 'minimum': 10 * i, 'title': f'Reward tier {i}',
+             'description': '<p>Thanks &amp; a "shout-out" in the credits.</p>' * 4,
+             'backers_count': rng.randint(0, 500)}
+            for i in range(1, 15)
+        ],
+        'video': video,
+        'urls': {'web': {'project': f'https://www.kickstarter.com/projects/bench/{project_id}'}},
+    }
+    blob = html_module.escape(json.dumps(project), quote=True)
+
+    filler_block = '<div class="grid-row"><p class="type-14">Lorem ipsum dolor sit amet.</p></div>\n'
+    filler = filler_block * (padding_kb * 1024 // len(filler_block))
+
+    return (
+        '<!DOCTYPE html><html><head>'
+        f'<title>{html_module.escape(title)} by Bench Creator &mdash; Kickstarter</title>'
+        '<script>window.ksr_track = {};</script>'
+        '</head><body>'
+        f'<h1 class="project-name">{html_module.escape(title)}</h1>'
+        f'{filler}'
+        f'<script>window.current_project = "{blob}";</script>'
+        '</body></html>'
+    ).encode('utf-8')
+
+
+def load_pages(pages_dir):
+    """Load saved pages (*.html, *.html.gz) from a directory"""
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        path = os.path.join(pages_dir, name)
+        if name.endswith('.html.gz'):
+            with gzip.open(path, 'rb') as f:
+                pages.append((name, f.read()))
+        elif name.endswith('.html') or name.endswith('.htm'):
+            with open(path, 'rb') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def bench_extract(pages, repeat=3):
+    """Time the BeautifulSoup extraction path against the raw-bytes fast path"""
+    downloader = AdvancedKickstarterDownloader.__new__(AdvancedKickstarterDownloader)
+
+    def soup_path(content):
+        soup = BeautifulSoup(content, 'html.parser')
+        title_elem = soup.find('h1') or soup.find('title')
+        title = title_elem.get_text(strip=True) if title_elem else None
+        return title, downloader.extract_main_video_only(soup, None)
+
+    def fast_path(content):
+        result = downloader.extract_main_video_fast(content)
+        if result is None:
+            return None
+        return result['title'], result['videos']
+
+    timings = {}
+    outputs = {}
+    devnull = open(os.devnull, 'w')
+    real_stdout = sys.stdout
+    try:
+        sys.stdout = devnull  # extraction prints per page
+        for label, func in (('beautifulsoup', soup_path), ('fast', fast_path)):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                outputs[label] = [func(content) for _, content in pages]
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+    fallbacks = sum(1 for out in outputs['fast'] if out is None)
+    mismatches = [
+        name for (name, _), slow, fast in zip(pages, outputs['beautifulsoup'], outputs['fast'])
+        if fast is not None and (slow[0] != fast[0] or
+                                 [v['url'] for v in slow[1]] != [v['url'] for v in fast[1]])
+    ]
+
+    total_mb = sum(len(content) for _, content in pages) / (1024 * 1024)
+    print(f"Pages: {len(pages)} ({total_mb:.1f} MB), best of {repeat}")
+    for label, seconds in timings.items():
+        print(f"  {label:<14} {seconds * 1000 / len(pages):8.2f} ms/page  {total_mb / seconds:8.1f} MB/s")
+    print(f"  speedup        {timings['beautifulsoup'] / timings['fast']:8.1f}x")
+    print(f"  fast-path fallbacks: {fallbacks}, title/video mismatches: {len(mismatches)}")
+    for name in mismatches[:10]:
+        print(f"    mismatch: {name}")
+
+    return {'timings': timings, 'fallbacks': fallbacks, 'mismatches': mismatches}
+
+
+def make_sample_video(path, seconds=60, ffmpeg=None):
+    """Render a 720p H.264/AAC test clip with ffmpeg"""
+    ffmpeg = ffmpeg or find_ffmpeg()
+    subprocess.run([
+        ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', 'testsrc=size=1280x720:rate=25',
+        '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100',
+        '-t', str(seconds), '-c:v', 'libx264', '-preset', 'ultrafast',
+        '-c:a', 'aac', '-b:a', '128k', '-shortest', path,
+    ], check=True)
+    return path
+
+
+def bench_convert(video_paths):
+    """Time moviepy against the ffmpeg extraction engine (transcode and stream copy)"""
+    from moviepy import VideoFileClip
+
+    def with_moviepy(video_path, out_dir):
+        audio_path = os.path.join(out_dir, os.path.splitext(os.path.basename(video_path))[0] + '.mp3')
+        with VideoFileClip(video_path) as video:
+            if video.audio:
+                video.audio.write_audiofile(audio_path, logger=None)
+
+    backends = (
+        ('moviepy', with_moviepy),
+        ('ffmpeg mp3', lambda path, out_dir: extract_audio(path, out_dir, 'mp3')),
+        ('ffmpeg auto', lambda path, out_dir: extract_audio(path, out_dir, 'auto')),
+    )
+
+    total_mb = sum(os.path.getsize(path) for path in video_paths) / (1024 * 1024)
+    print(f"Videos: {len(video_paths)} ({total_mb:.1f} MB)")
+    timings = {}
+    for label, func in backends:
+        with tempfile.TemporaryDirectory() as out_dir:
+            start = time.perf_counter()
+            for path in video_paths:
+                func(path, out_dir)
+            timings[label] = time.perf_counter() - start
+        print(f"  {label:<12} {timings[label]:7.2f}s  {len(video_paths) / timings[label]:6.2f} files/s")
+
+    for label in ('ffmpeg mp3', 'ffmpeg auto'):
+        print(f"  {label} vs moviepy: {timings['moviepy'] / timings[label]:.1f}x")
+    return timings
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves synthetic project pages and Range-capable MP4s, with injected faults"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _send(self, status, body=b'', headers=None, head=False):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _handle(self, head):
+        server = self.server
+        path = urlparse(self.path).path
+        is_page = path.startswith('/projects/')
+
+        fault = server.pick_fault(is_page)
+        if fault == 'slow':
+            time.sleep(server.slow_seconds)
+        elif fault == 403:
+            self._send(403, b'<html><title>Access denied</title></html>', {'Content-Type': 'text/html'}, head)
+            return
+        elif fault == 429:
+            self._send(429, b'Too Many Requests', {'Retry-After': str(server.retry_after)}, head)
+            return
+
+        if is_page:
+            project_id = int(path.rstrip('/').rsplit('/', 1)[1])
+            body = server.page(project_id)
+            self._send(200, body, {'Content-Type': 'text/html; charset=utf-8'}, head)
+        elif path.startswith('/videos/'):
+            self._send_video(int(path.rsplit('/', 1)[1].split('_', 1)[0]), head)
+        else:
+            self._send(404, b'Not found', head=head)
+
+    def _send_video(self, video_id, head):
+        size = self.server.video_size
+        start, end = 0, size - 1
+        status = 200
+        headers = {'Content-Type': 'video/mp4', 'Accept-Ranges': 'bytes'}
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            if start >= size:
+                self._send(416, headers={'Content-Range': f'bytes */{size}'}, head=head)
+                return
+            if match.group(2):
+                end = min(int(match.group(2)), size - 1)
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+
+        # Paced per connection, so parallel segments see a realistic link
+        chunk = 256 * 1024
+        per_chunk = chunk / (self.server.mbps * 1024 * 1024) if self.server.mbps else 0
+        for offset in range(start, end + 1, chunk):
+            piece = self.server.video_slice(video_id, offset, min(offset + chunk, end + 1))
+            try:
+                self.wfile.write(piece)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            self.server.count('video_bytes', len(piece))
+            if per_chunk:
+                time.sleep(per_chunk * len(piece) / chunk)
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    """Local Kickstarter stand-in: /projects/bench/<id> pages and /videos/<id>_high.mp4.
+
+    Every no_video_every-th project has no video, and every duplicate_every-th
+    project is a relaunch that points at the previous project's video. Each
+    video's bytes end in its id, so different videos never hash the same.
+    Requests fail with 403 or
+    429 (with Retry-After), or are delayed, at the given rates; faults hit
+    pages only unless fault_videos is set.
+    """
+
+    daemon_threads = True
+
+    VIDEO_TAG_BYTES = 16
+
+    def __init__(self, video_data, no_video_every=5, rate_403=0.0, rate_429=0.0, rate_slow=0.0,
+                 slow_seconds=2.0, retry_after=1, fault_videos=False, mbps=None, seed=0,
+                 duplicate_every=0):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.video_data = video_data
+        self.video_size = len(video_data) + self.VIDEO_TAG_BYTES
+        self.no_video_every = no_video_every
+        self.duplicate_every = duplicate_every
+        self.rates = ((403, rate_403), (429, rate_429), ('slow', rate_slow))
+        self.slow_seconds = slow_seconds
+        self.retry_after = retry_after
+        self.fault_videos = fault_videos
+        self.mbps = mbps
+        self.counters = {'requests': 0, 'video_bytes': 0, 403: 0, 429: 0, 'slow': 0}
+        self._pages = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def project_url(self, project_id):
+        return f"{self.base_url}/projects/bench/{project_id}"
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-response is normal here (cancelled segments)
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+    def video_slice(self, video_id, start, stop):
+        """Bytes [start, stop) of the video with this id: the shared data plus an id tag"""
+        size = len(self.video_data)
+        tag = str(video_id).zfill(self.VIDEO_TAG_BYTES).encode()
+        return self.video_data[start:min(stop, size)] + tag[max(start - size, 0):max(stop - size, 0)]
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def pick_fault(self, is_page):
+        with self._lock:
+            self.counters['requests'] += 1
+            if not is_page and not self.fault_videos:
+                return None
+            roll = self._rng.random()
+            for fault, rate in self.rates:
+                if roll < rate:
+                    self.counters[fault] += 1
+                    return fault
+                roll -= rate
+        return None
+
+    def page(self, project_id):
+        with self._lock:
+            page = self._pages.get(project_id)
+        if page is None:
+            source_id = project_id
+            if self.duplicate_every and project_id % self.duplicate_every == 0:
+                source_id = project_id - 1
+            video_url = None
+            if not self.no_video_every or source_id % self.no_video_every:
+                video_url = f"{self.base_url}/videos/{source_id}_high.mp4"
+            page = make_project_page(project_id, f"Bench Project {project_id}", video_url,
+                                     video_id=100000 + source_id)
+            with self._lock:
+                self._pages[project_id] = page
+        return page
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="stand-in")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def make_video_data(size_mb, convert=False, seconds=30):
+    """Bytes served as every /videos/ file: a real clip when converting, random bytes otherwise"""
+    if convert:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = make_sample_video(os.path.join(tmp, 'sample.mp4'), seconds)
+            with open(path, 'rb') as f:
+                return f.read()
+    return os.urandom(int(size_mb * 1024 * 1024))
+
+
+def offline_downloader(csv_file, download_dir, **kwargs):
+    """A downloader tuned for the stand-in server: short page spacing, HTTP fetchers only"""
+    # No browsers offline; the stand-in serves plain HTML
+    options = dict(page_delay=(0.01, 0.02), page_delay_floor=0.005, page_cache=False,
+                   retry_base_delay=0.5, retry_max_delay=5, metrics_interval=5,
+                   fetch_backends=('cloudscraper', 'requests'))
+    options.update(kwargs)
+    return AdvancedKickstarterDownloader(csv_file, download_dir=download_dir, **options)
+
+
+def quietly(func, *args, **kwargs):
+    """Call func with the scraper's per-project printing sent to /dev/null"""
+    devnull = open(os.devnull, 'w')
+    real_stdout = sys.stdout
+    try:
+        sys.stdout = devnull
+        return func(*args, **kwargs)
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+
+def bench_pipeline(server, projects=50, workers=2, download_workers=4, convert=False,
+                   audio_format='mp3', verbose=False):
+    """Run process_projects end to end against the stand-in server"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, 'projects.csv')
+        with open(csv_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'url'])
+            for project_id in range(1, projects + 1):
+                writer.writerow([project_id, server.project_url(project_id)])
+
+        downloader = offline_downloader(csv_file, os.path.join(tmp, 'out'), audio_format=audio_format)
+        run = downloader.process_projects
+        start = time.perf_counter()
+        if verbose:
+            run(convert_audio=convert, workers=workers, download_workers=download_workers)
+        else:
+            quietly(run, convert_audio=convert, workers=workers, download_workers=download_workers)
+        elapsed = time.perf_counter() - start
+
+        spans = downloader.stats['spans']
+        ledger = downloader.ledger.summary()
+        downloader.ledger.close()
+
+    download_mb = spans.get('download', {}).get('bytes', 0) / (1024 * 1024)
+    conversions = spans.get('convert', {}).get('count', 0)
+    finished = sum(ledger.values())
+    print(f"Pipeline: {projects} projects, scrape x{workers}, download x{download_workers}"
+          + (f", convert ({audio_format})" if convert else ""))
+    print(f"  wall time         {elapsed:8.1f}s")
+    print(f"  projects/min      {finished / elapsed * 60:8.1f}")
+    print(f"  download MB/s     {download_mb / elapsed:8.1f}  ({download_mb:.1f} MB)")
+    if convert:
+        print(f"  conversions/s     {conversions / elapsed:8.2f}")
+    print(f"  peak RSS          {(peak_rss_bytes() or 0) / 1024 ** 2:8.1f} MB")
+    print(f"  retries           {downloader.stats['retries_scheduled']:8d}")
+    if downloader.stats['dedupe_reused'] or downloader.stats['dedupe_hash_matches']:
+        print(f"  dedupe            reused={downloader.stats['dedupe_reused']}, "
+              f"identical={downloader.stats['dedupe_hash_matches']}, "
+              f"not downloaded={downloader.stats['dedupe_bytes_not_downloaded'] / 1024 ** 2:.1f} MB, "
+              f"conversions skipped={downloader.stats['dedupe_conversions_skipped']}")
+    print(f"  ledger            " + ", ".join(f"{k}={v}" for k, v in sorted(ledger.items())))
+    print(f"  server            " + ", ".join(f"{k}={v}" for k, v in server.counters.items()))
+    for name in ('stage.scrape', 'stage.download', 'stage.convert', 'throttle.page'):
+        if name in spans:
+            snap = spans[name]
+            print(f"  {name:<17} p50={snap['p50']:.3f}s p95={snap['p95']:.3f}s n={snap['count']}")
+    return {'seconds': elapsed, 'ledger': ledger, 'spans': spans}
+
+
+def bench_download(server, count=5, segment_options=(1, 4)):
+    """Time direct video downloads with and without parallel byte-range segments"""
+    size_mb = len(server.video_data) / (1024 * 1024)
+    print(f"Downloads: {count} x {size_mb:.1f} MB" + (f" at {server.mbps} MB/s per connection" if server.mbps else ""))
+    results = {}
+    for segments in segment_options:
+        with tempfile.TemporaryDirectory() as tmp:
+            downloader = offline_downloader(os.path.join(tmp, 'none.csv'), tmp, download_segments=segments,
+                                            segment_threshold_mb=min(16, size_mb / 2), min_segment_mb=1)
+            start = time.perf_counter()
+            ok = sum(
+                bool(quietly(downloader.download_video,
+                             {'url': f"{server.base_url}/videos/{i}_high.mp4", 'type': 'direct'},
+                             downloader.videos_dir, f"{i}_bench"))
+                for i in range(count)
+            )
+            elapsed = time.perf_counter() - start
+            downloader.ledger.close()
+        results[segments] = elapsed
+        print(f"  segments={segments:<3} {elapsed:7.2f}s  {count * size_mb / elapsed:7.1f} MB/s  ({ok}/{count} ok)")
+    return results
+
+
+STARTUP_PROBE = """
+import json, os, sys, tempfile, time
+start = time.perf_counter()
+import scrapper
+imported = time.perf_counter()
+with tempfile.TemporaryDirectory() as tmp:
+    downloader = scrapper.AdvancedKickstarterDownloader(os.path.join(tmp, 'none.csv'), download_dir=tmp)
+    ready = time.perf_counter()
+    downloader.ledger.close()
+# Modules scrapper imports on first use; requests is needed by every fetch
+# and download, so it is loaded up front and not listed here
+heavy = ('selenium', 'undetected_chromedriver', 'cloudscraper', 'moviepy', 'bs4', 'numpy',
+         'yt_dlp', 'zstandard')
+print(json.dumps({'import': imported - start, 'init': ready - imported,
+                  'rss': scrapper.peak_rss_bytes(), 'loaded': [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def bench_startup(repeat=5):
+    """Cold start of a worker: import scrapper and build a downloader in a fresh interpreter"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', STARTUP_PROBE], cwd=here,
+                                capture_output=True, text=True, check=True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    best = min(runs, key=lambda run: run['import'] + run['init'])
+    print(f"Worker startup, best of {repeat}")
+    print(f"  import scrapper     {best['import']:6.2f}s")
+    print(f"  build downloader    {best['init']:6.2f}s")
+    if best['rss']:
+        print(f"  peak RSS         {best['rss'] / (1024 * 1024):7.1f} MB")
+    print(f"  heavy modules loaded: {', '.join(best['loaded']) or 'none'}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for scrapper.py")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    extract = sub.add_parser('extract', help="Compare page extraction paths")
+    extract.add_argument('--pages', help="Directory of saved project pages (*.html / *.html.gz)")
+    extract.add_argument('--synthetic', type=int, default=50,
+                         help="Number of synthetic pages to use when --pages is not given")
+    extract.add_argument('--repeat', type=int, default=3)
+
+    convert = sub.add_parser('convert', help="Compare audio extraction backends")
+    convert.add_argument('--videos', help="Directory of videos to convert")
+    convert.add_argument('--limit', type=int, default=10)
+    convert.add_argument('--seconds', type=int, default=60,
+                         help="Length of the generated clip when --videos is not given")
+
+    startup = sub.add_parser('startup', help="Time a worker's cold start and baseline memory")
+    startup.add_argument('--repeat', type=int, default=5)
+
+    server_args = argparse.ArgumentParser(add_help=False)
+    server_args.add_argument('--video-mb', type=float, default=8, help="Size of each served video")
+    server_args.add_argument('--mbps', type=float, default=None,
+                             help="Pace each video connection to this many MB/s")
+    server_args.add_argument('--no-video-every', type=int, default=5,
+                             help="Every Nth project has no video (0: all have one)")
+    server_args.add_argument('--rate-403', type=float, default=0.0, help="Fraction of page requests answered 403")
+    server_args.add_argument('--rate-429', type=float, default=0.0,
+                             help="Fraction of page requests answered 429 with Retry-After")
+    server_args.add_argument('--rate-slow', type=float, default=0.0, help="Fraction of page requests delayed")
+    server_args.add_argument('--slow-seconds', type=float, default=2.0)
+    server_args.add_argument('--retry-after', type=int, default=1)
+    server_args.add_argument('--duplicate-every', type=int, default=0,
+                             help="Every Nth project reuses the previous project's video (0: none)")
+    server_args.add_argument('--fault-videos', action='store_true', help="Inject faults into video requests too")
+
+    pipeline = sub.add_parser('pipeline', parents=[server_args],
+                              help="Run the full scrape -> download -> convert pipeline against a local stand-in")
+    pipeline.add_argument('--projects', type=int, default=50)
+    pipeline.add_argument('--workers', type=int, default=2)
+    pipeline.add_argument('--download-workers', type=int, default=4)
+    pipeline.add_argument('--convert', action='store_true', help="Serve a real clip and extract audio")
+    pipeline.add_argument('--audio-format', default='mp3', choices=('mp3', 'm4a', 'auto'))
+    pipeline.add_argument('--seconds', type=int, default=30, help="Length of the served clip with --convert")
+    pipeline.add_argument('--verbose', action='store_true', help="Show the scraper's own output")
+
+    download = sub.add_parser('download', parents=[server_args],
+                              help="Compare single-stream and segmented video downloads")
+    download.add_argument('--count', type=int, default=5)
+    download.add_argument('--segments', type=int, nargs='+', default=[1, 4])
+
+    serve = sub.add_parser('serve', parents=[server_args],
+                           help="Only run the stand-in server (for manual runs)")
+    serve.add_argument('--projects', type=int, default=20, help="Number of project URLs to list")
+
+    args = parser.parse_args()
+
+    if args.command in ('pipeline', 'download', 'serve'):
+        convert_clip = args.command == 'pipeline' and args.convert
+        server = StandInServer(
+            make_video_data(args.video_mb, convert_clip, getattr(args, 'seconds', 30)),
+            no_video_every=args.no_video_every, rate_403=args.rate_403, rate_429=args.rate_429,
+            rate_slow=args.rate_slow, slow_seconds=args.slow_seconds, retry_after=args.retry_after,
+            fault_videos=args.fault_videos, mbps=args.mbps, duplicate_every=args.duplicate_every,
+        ).start()
+        try:
+            if args.command == 'pipeline':
+                bench_pipeline(server, args.projects, args.workers, args.download_workers,
+                               args.convert, args.audio_format, args.verbose)
+            elif args.command == 'download':
+                bench_download(server, args.count, args.segments)
+            else:
+                print(f"Stand-in server on {server.base_url} (Ctrl+C to stop)")
+                print("id,url")
+                for project_id in range(1, args.projects + 1):
+                    print(f"{project_id},{server.project_url(project_id)}")
+                while True:
+                    time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+        return
+
+    if args.command == 'startup':
+        bench_startup(args.repeat)
+
+    elif args.command == 'extract':
+        if args.pages:
+            pages = load_pages(args.pages)
+        else:
+            pages = [
+                (f"synthetic_{i}", make_project_page(
+                    i, f"Bench Project {i}",
+                    f"https://v.kickstarter.com/1/projects/{i}/video-{i}-h264_high.mp4" if i % 5 else None))
+                for i in range(1, args.synthetic + 1)
+            ]
+        if not pages:
+            print("No pages to benchmark")
+            return
+        bench_extract(pages, repeat=args.repeat)
+
+    elif args.command == 'convert':
+        if args.videos:
+            paths = sorted(
+                os.path.join(args.videos, name) for name in os.listdir(args.videos)
+                if name.lower().endswith(('.mp4', '.mov', '.webm', '.mkv'))
+            )[:args.limit]
+            bench_convert(paths)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                bench_convert([make_sample_video(os.path.join(tmp, 'sample.mp4'), args.seconds)])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,1839 @@
 import os
+import sys
 import csv
 import json
 import time
 import re
 import requests
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import undetected_chromedriver as uc
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import random
-import cloudscraper
 import math
-from moviepy import VideoFileClip
+import gzip
+import hashlib
+import shutil
+import tempfile
+import sqlite3
+import html as html_module
+import threading
+import multiprocessing
+import queue
+import heapq
+import argparse
+import cProfile
+import pstats
+import tracemalloc
+import socket
+import importlib.util
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS comes from psutil when it is installed
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Page fetch backends in their default (cheapest-first) order: name ->
+# (downloader method, modules it needs). The modules are imported inside the
+# methods on first use, so a run that never falls back to a browser never
+# loads selenium; fetch_backends picks which of these run at all.
+FETCH_BACKENDS = {
+    'cloudscraper': ('_fetch_with_cloudscraper', ('cloudscraper',)),
+    'requests': ('_fetch_with_enhanced_requests', ()),
+    'chrome': ('_fetch_with_selenium_stealth', ('selenium', 'undetected_chromedriver')),
+    'firefox': ('_fetch_with_headless_firefox', ('selenium',)),
+}
+
+# Optional modules for single code paths, also imported on first use:
+# yt_dlp for YouTube/Vimeo (else the yt-dlp command), zstandard for the page
+# cache (else gzip)
+YTDLP_MODULES = ('yt_dlp',)
+ZSTD_MODULES = ('zstandard',)
+
+# Audio extraction backends: name -> modules it needs. ffmpeg is a binary
+# (see find_ffmpeg); moviepy is only imported when it is actually used.
+CONVERT_BACKENDS = {
+    'ffmpeg': (),
+    'moviepy': ('moviepy',),
+}
+
+
+def missing_modules(modules):
+    """The modules in this list that are not installed, checked without importing them"""
+    return [name for name in modules if importlib.util.find_spec(name) is None]
+
+
+# URL patterns the browser fetchers never need: we only read the project JSON
+# out of the HTML, so images, fonts, media and trackers are pure overhead.
+BLOCKED_BROWSER_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.m3u8', '*.ts', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*facebook.com/tr*', '*segment.io*', '*segment.com*',
+    '*hotjar.com*', '*sentry.io*', '*newrelic.com*', '*nr-data.net*',
+]
+
+
+# Byte-level patterns for the fast extraction path (see extract_main_video_fast)
+PROJECT_JSON_MARKER = b'window.current_project = "'
+VIDEO_KEY_RE = re.compile(rb'&quot;video&quot;\s*:\s*')
+# Tokens that matter for walking the HTML-escaped project JSON: string
+# delimiters and brackets (brackets inside strings are skipped)
+JSON_TOKEN_RE = re.compile(rb'&quot;|[{}\[\]]')
+H1_RE = re.compile(rb'<h1\b[^>]*>(.*?)</h1\s*>', re.IGNORECASE | re.DOTALL)
+TITLE_RE = re.compile(rb'<title\b[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Responses that mean "slow down" rather than "this page is broken"
+BLOCK_STATUSES = (403, 429, 503)
+CHALLENGE_MARKERS = (
+    b'<title>Just a moment',
+    b'Attention Required! | Cloudflare',
+    b'cf_chl_opt',
+    b'cf-chl-widget',
+    b'challenges.cloudflare.com/turnstile',
+)
+
+
+# Audio outputs we know how to produce; any of them counts as "audio exists"
+AUDIO_EXTENSIONS = ('.mp3', '.m4a')
+# Finished video files; .part/.segpart/.tmp and other leftovers are not
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mov', '.mkv')
+
+# Which source codecs can be stream-copied into which container, per audio_format
+AUDIO_COPY_TARGETS = {
+    'mp3': {'mp3': '.mp3'},
+    'm4a': {'aac': '.m4a'},
+    'auto': {'aac': '.m4a', 'mp3': '.mp3'},
+}
+
+AUDIO_MUXERS = {'.mp3': 'mp3', '.m4a': 'ipod'}
+
+
+def audio_output_plan(codec, audio_format):
+    """(extension, 'copy' | 'transcode', ffmpeg codec args) for a source audio codec"""
+    copy_ext = AUDIO_COPY_TARGETS[audio_format].get(codec)
+    if copy_ext:
+        return copy_ext, 'copy', ['-c:a', 'copy']
+    if audio_format == 'm4a':
+        return '.m4a', 'transcode', ['-c:a', 'aac', '-b:a', '128k']
+    return '.mp3', 'transcode', ['-c:a', 'libmp3lame', '-q:a', '4']
+
+
+def find_ffmpeg():
+    """Path to an ffmpeg binary: PATH first, then the copy bundled with imageio-ffmpeg (a moviepy dependency)"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def probe_audio_codec(ffmpeg, video_path):
+    """Return the codec of the first audio stream, or None if the file has no audio.
+
+    Reads only the container header (`ffmpeg -i` with no output), so nothing
+    is decoded and no separate ffprobe binary is needed.
+    """
+    result = subprocess.run([ffmpeg, '-hide_banner', '-i', video_path],
+                            capture_output=True, text=True, errors='replace', timeout=120)
+    match = re.search(r'Stream #\S+.*?: Audio: (\w+)', result.stderr)
+    if match:
+        return match.group(1)
+    if 'Stream #' not in result.stderr:
+        # Not even a video stream: unreadable or truncated file
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "ffmpeg probe failed")
+    return None
+
+
+def extract_audio(video_path, audio_dir, audio_format='mp3', ffmpeg=None):
+    """Extract the audio track of video_path into audio_dir with ffmpeg.
+
+    The audio stream is demuxed and stream-copied when its codec fits the
+    requested format (AAC -> .m4a, MP3 -> .mp3), and only transcoded
+    otherwise; the video stream is never decoded. Output is written to a
+    temporary name and renamed into place once ffmpeg succeeds.
+
+    Returns (audio_path, 'copy' | 'transcode'), or (None, None) when the
+    video has no audio track. Raises RuntimeError if ffmpeg fails.
+    """
+    ffmpeg = ffmpeg or find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+
+    codec = probe_audio_codec(ffmpeg, video_path)
+    if codec is None:
+        return None, None
+
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    ext, mode, codec_args = audio_output_plan(codec, audio_format)
+
+    audio_path = os.path.join(audio_dir, stem + ext)
+    tmp_path = f"{audio_path}.{os.getpid()}.part"
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-i', video_path,
+           '-map', '0:a:0', '-vn', '-sn', '-dn'] + codec_args + ['-f', AUDIO_MUXERS[ext], tmp_path]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, errors='replace', timeout=1800)
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()[-300:]}")
+
+    os.replace(tmp_path, audio_path)
+    return audio_path, mode
+
+
+def extract_audio_moviepy(video_path, audio_dir):
+    """Old moviepy path: decode through VideoFileClip and re-encode to MP3.
+
+    Returns (audio_path, 'transcode') or (None, None) when there is no audio track.
+    """
+    from moviepy import VideoFileClip
+
+    audio_path = os.path.join(audio_dir, os.path.splitext(os.path.basename(video_path))[0] + ".mp3")
+    with VideoFileClip(video_path) as video:
+        if not video.audio:
+            return None, None
+        video.audio.write_audiofile(audio_path, logger=None)
+    return audio_path, 'transcode'
+
+
+def convert_video_file(video_path, audio_dir, audio_format='mp3', ffmpeg=None):
+    """Process-pool entry point: extract one video's audio and report what happened.
+
+    Returns a dict with video_path, audio_path, mode, seconds, video_bytes and
+    error; never raises, so one bad file can't take down a whole batch.
+    """
+    start = time.time()
+    result = {
+        'video_path': video_path,
+        'audio_path': None,
+        'mode': None,
+        'seconds': 0.0,
+        'video_bytes': os.path.getsize(video_path) if os.path.exists(video_path) else 0,
+        'error': None,
+    }
+    try:
+        if ffmpeg:
+            audio_path, mode = extract_audio(video_path, audio_dir, audio_format, ffmpeg)
+        else:
+            audio_path, mode = extract_audio_moviepy(video_path, audio_dir)
+        result['audio_path'] = audio_path
+        result['mode'] = mode
+        if audio_path is None:
+            result['error'] = 'no audio track'
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = round(time.time() - start, 2)
+    return result
+
+
+def existing_audio_path(audio_dir, stem):
+    """Path of an already extracted audio file for this video stem, if any"""
+    for ext in AUDIO_EXTENSIONS:
+        path = os.path.join(audio_dir, stem + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def asset_url_key(url):
+    """A video URL without its query string, which CDNs use for expiring signatures"""
+    parsed = urlparse(url)
+    return parsed._replace(query='', fragment='').geturl()
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_asset(src, dst):
+    """Hardlink src to dst, replacing dst. Returns (path, 'hardlink' | 'reference').
+
+    Where hardlinks aren't possible (another volume, FAT/exFAT, network
+    shares) nothing is written and the caller keeps referring to src.
+    """
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return dst, 'hardlink'
+    tmp_path = f"{dst}.{os.getpid()}.link"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        return src, 'reference'
+    os.replace(tmp_path, dst)
+    return dst, 'hardlink'
+
+
+def looks_like_challenge(content):
+    """True for a Cloudflare challenge/block page instead of a project page"""
+    if PROJECT_JSON_MARKER in content:
+        return False
+    head = content[:64 * 1024]
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def retry_after_seconds(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class PageStatusError(Exception):
+    """A browser fetch landed on an HTTP error page (browsers don't raise on their own)"""
+
+    def __init__(self, url, status_code):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+
+
+def error_status(error):
+    """HTTP status behind a fetch error, from requests or a browser, or None"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def blocked_response_info(error):
+    """(status, retry_after) if a fetch error means the host is pushing back, else None"""
+    if 'Cloudflare' in type(error).__name__:
+        # cloudscraper raises these when it can't solve a challenge
+        return 'challenge', None
+    if isinstance(error, PageStatusError):
+        return (error.status_code, None) if error.status_code in BLOCK_STATUSES else None
+    response = getattr(error, 'response', None)
+    if response is None or response.status_code not in BLOCK_STATUSES:
+        return None
+    return response.status_code, retry_after_seconds(response.headers.get('Retry-After'))
+
+
+def parse_shard(spec):
+    """Parse an 'i/n' shard spec (0-based index) into (index, count)"""
+    try:
+        index, count = (int(part) for part in str(spec).split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/n such as 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', index must be in 0..{count - 1}")
+    return index, count
+
+
+def shard_of(project_id, count):
+    """Stable shard number for a project id (same answer on every machine)"""
+    digest = hashlib.sha1(str(project_id).strip().encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+class _AudioStreamTee:
+    """File-like sink that feeds ffmpeg's stdin and optionally a copy of the video.
+
+    If ffmpeg exits early the pipe breaks; we note it and keep writing the
+    video copy (if any) so the fallback can convert from disk.
+    """
+
+    def __init__(self, pipe, video_file=None):
+        self.pipe = pipe
+        self.video_file = video_file
+        self.written = 0
+        self.pipe_broken = False
+        self.failed = False
+
+    def write(self, data):
+        if not self.pipe_broken:
+            try:
+                self.pipe.write(data)
+            except (BrokenPipeError, OSError):
+                self.pipe_broken = True
+                if self.video_file is None:
+                    raise
+        if self.video_file is not None:
+            self.video_file.write(data)
+        self.written += len(data)
+
+    def close(self):
+        for f in (self.pipe, self.video_file):
+            if f is None:
+                continue
+            try:
+                f.close()
+            except (BrokenPipeError, OSError):
+                self.pipe_broken = True
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Each consumed token is refilled after a random interval drawn from
+    [min_interval, max_interval], so a bucket with capacity 1 and a 15-30s
+    interval reproduces the old "one project every 15-30 seconds" pacing.
+    """
+
+    def __init__(self, min_interval, max_interval=None, capacity=1):
+        self.min_interval = min_interval
+        self.max_interval = min_interval if max_interval is None else max_interval
+        self.capacity = capacity
+        self.tokens = capacity
+        self._next_refill = None
+        self._lock = threading.Lock()
+
+    def _draw_interval(self):
+        return random.uniform(self.min_interval, self.max_interval)
+
+    def acquire(self):
+        """Block until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._next_refill is not None and now >= self._next_refill:
+                    self.tokens += 1
+                    if self.tokens < self.capacity:
+                        self._next_refill += self._draw_interval()
+                    else:
+                        self._next_refill = None
+
+                if self.tokens > 0:
+                    self.tokens -= 1
+                    if self._next_refill is None:
+                        self._next_refill = now + self._draw_interval()
+                    return waited
+
+                wait = self._next_refill - now
+
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Capacity-1 token bucket whose interval adapts to the host's responses (AIMD).
+
+    Each clean fetch raises the request rate by rate_step per minute
+    (additive increase). A block (403/429/503 or a challenge page) multiplies
+    the rate by backoff_factor (multiplicative decrease). If the block carried
+    a Retry-After, all requests also wait until it has passed. The mean
+    interval stays within [min_interval, max_interval], and every draw keeps
+    +/- jitter around it, so fetches never settle into a fixed rhythm.
+    """
+
+    def __init__(self, interval, min_interval, max_interval, jitter=0.0,
+                 rate_step=0.25, backoff_factor=0.5):
+        super().__init__(interval)
+        self.interval = interval
+        self.floor = min_interval
+        self.ceiling = max_interval
+        self.jitter = jitter
+        self.rate_step = rate_step
+        self.backoff_factor = backoff_factor
+        self.successes = 0
+        self.blocks = 0
+        self.fastest = interval
+        self.slowest = interval
+        self._hold_until = 0.0
+
+    def _draw_interval(self):
+        spread = self.interval * self.jitter
+        return random.uniform(self.interval - spread, self.interval + spread)
+
+    def rate_per_minute(self):
+        return 60.0 / self.interval
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                hold = self._hold_until - time.monotonic()
+            if hold <= 0:
+                break
+            time.sleep(hold)
+            waited += hold
+        return waited + super().acquire()
+
+    def record_success(self):
+        """Additive increase; returns the new mean interval"""
+        with self._lock:
+            self.successes += 1
+            self.interval = max(self.floor, 60.0 / (self.rate_per_minute() + self.rate_step))
+            self.fastest = min(self.fastest, self.interval)
+            return self.interval
+
+    def record_block(self, retry_after=None):
+        """Multiplicative decrease (and an optional hold); returns the new mean interval"""
+        with self._lock:
+            self.blocks += 1
+            self.interval = min(self.ceiling, self.interval / self.backoff_factor)
+            self.slowest = max(self.slowest, self.interval)
+            now = time.monotonic()
+            if retry_after:
+                self._hold_until = max(self._hold_until, now + min(retry_after, self.ceiling))
+            # Apply the slowdown to the very next request, not the one after it
+            self.tokens = 0
+            self._next_refill = max(self._next_refill or now, now + self._draw_interval())
+            return self.interval
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'interval_seconds': round(self.interval, 2),
+                'rate_per_minute': round(self.rate_per_minute(), 2),
+                'successes': self.successes,
+                'blocks': self.blocks,
+                'fastest_interval': round(self.fastest, 2),
+                'slowest_interval': round(self.slowest, 2),
+            }
+
+
+class SessionPool:
+    """Per-thread HTTP sessions of one kind that share a tuned connection pool.
+
+    requests.Session isn't safe to share between threads, so every worker
+    thread checks out its own session from factory. All sessions of a kind
+    mount the same adapters (urllib3's pool manager is thread-safe) and the
+    same cookie jar. Keep-alive connections and Cloudflare clearance cookies
+    are therefore reused across threads, while headers stay per thread.
+    """
+
+    PREFIXES = ('https://', 'http://')
+
+    def __init__(self, name, factory, pool_connections=10, pool_maxsize=32, retries=2):
+        self.name = name
+        self.factory = factory
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        # Connection-level retries only: status codes are left to the
+        # adaptive limiter and the retry scheduler.
+        self.retry = Retry(total=retries, connect=retries, read=1, status=0, redirect=5,
+                           backoff_factor=0.5, allowed_methods=('GET', 'HEAD'),
+                           raise_on_status=False, respect_retry_after_header=False)
+        self._adapters = None
+        self._cookies = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _tune(self, adapter):
+        # Re-initialising keeps adapter subclasses (cloudscraper's TLS cipher adapter) intact
+        adapter._pool_connections = self.pool_connections
+        adapter._pool_maxsize = self.pool_maxsize
+        adapter._pool_block = False
+        adapter.init_poolmanager(self.pool_connections, self.pool_maxsize, block=False)
+        adapter.max_retries = self.retry
+        return adapter
+
+    def get(self):
+        """This thread's session, created on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self.factory()
+            with self._lock:
+                if self._adapters is None:
+                    # The first session's adapters become the shared ones
+                    self._adapters = {prefix: self._tune(session.get_adapter(prefix))
+                                      for prefix in self.PREFIXES}
+                    self._cookies = session.cookies
+            for prefix, adapter in self._adapters.items():
+                session.mount(prefix, adapter)
+            session.cookies = self._cookies
+            self._local.session = session
+        return session
+
+    def connection_stats(self):
+        """Per-host requests, new connections and keep-alive reuse ratio"""
+        hosts = {}
+        with self._lock:
+            adapters = list(self._adapters.values()) if self._adapters else []
+        for adapter in {id(a): a for a in adapters}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or not pool.num_requests:
+                    continue
+                entry = hosts.setdefault(pool.host, {'requests': 0, 'connections': 0})
+                entry['requests'] += pool.num_requests
+                entry['connections'] += pool.num_connections
+        for entry in hosts.values():
+            entry['reuse_ratio'] = round(1 - entry['connections'] / entry['requests'], 3)
+        return hosts
+
+class _YtdlpQuietLogger:
+    """Swallows yt-dlp's console output; failures come back in the result dict"""
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        pass
+
+
+class YtdlpEngine:
+    """In-process yt-dlp runner fed from a queue.
+
+    Keeps one warm YoutubeDL per output folder, so extractors are set up
+    once. Queued URLs are downloaded back to back by a single background
+    thread, because YoutubeDL isn't thread-safe. Each download returns a
+    result dict (file, bytes, chosen format, failure reason) instead of a
+    bare return code.
+    """
+
+    # The trailing /best covers sources that don't report a height
+    VIDEO_FORMAT = 'best[height<=720]/best'
+    AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio/best[height<=480]/best'
+
+    def __init__(self, audio_only=False, socket_timeout=30, retries=3):
+        self.format = self.AUDIO_FORMAT if audio_only else self.VIDEO_FORMAT
+        self.socket_timeout = socket_timeout
+        self.retries = retries
+        self._instances = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _instance(self, target_dir):
+        ydl = self._instances.get(target_dir)
+        if ydl is None:
+            import yt_dlp
+            ydl = yt_dlp.YoutubeDL({
+                'format': self.format,
+                # ks_prefix is set on each info dict, so one instance serves every project
+                'outtmpl': '%(ks_prefix)s.%(ext)s',
+                'paths': {'home': target_dir},
+                'quiet': True,
+                'no_warnings': True,
+                'noprogress': True,
+                'noplaylist': True,
+                'nocheckcertificate': True,
+                'logger': _YtdlpQuietLogger(),
+                'socket_timeout': self.socket_timeout,
+                'retries': self.retries,
+            })
+            self._instances[target_dir] = ydl
+        return ydl
+
+    def submit(self, url, target_dir, filename_prefix):
+        """Queue a download; returns a Future resolving to the result dict"""
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="yt-dlp")
+                self._thread.start()
+        self._queue.put((url, target_dir, filename_prefix, future))
+        return future
+
+    def download(self, url, target_dir, filename_prefix):
+        return self.submit(url, target_dir, filename_prefix).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            url, target_dir, filename_prefix, future = item
+            if future.set_running_or_notify_cancel():
+                future.set_result(self._download_one(url, target_dir, filename_prefix))
+
+    def _download_one(self, url, target_dir, filename_prefix):
+        start = time.time()
+        result = {
+            'url': url, 'ok': False, 'path': None, 'bytes': 0, 'format_id': None,
+            'ext': None, 'height': None, 'acodec': None, 'error': None, 'seconds': 0.0,
+        }
+        try:
+            ydl = self._instance(target_dir)
+            info = ydl.extract_info(url, download=False)
+            info['ks_prefix'] = filename_prefix
+            info = ydl.process_ie_result(info, download=True)
+            downloaded = (info.get('requested_downloads') or [info])[0]
+            path = downloaded.get('filepath') or ydl.prepare_filename(info)
+            result.update(format_id=info.get('format_id'), ext=info.get('ext'),
+                          height=info.get('height'), acodec=info.get('acodec'))
+            if path and os.path.exists(path):
+                result.update(ok=True, path=path, bytes=os.path.getsize(path))
+            else:
+                result['error'] = 'yt-dlp finished without writing a file'
+        except Exception as e:
+            result['error'] = re.sub(r'^ERROR:\s*', '', str(e))
+        result['seconds'] = round(time.time() - start, 2)
+        return result
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        for ydl in self._instances.values():
+            ydl.close()
+        self._instances = {}
+
+
+class PipelineStage:
+    """One stage of the pipeline: a bounded input queue drained by its own workers.
+
+    The handler receives a job and returns the job to forward to the next
+    stage, None when the job is finished, or RetryLater to run it again
+    after a delay. put() blocks while the queue
+    is full, which is what gives upstream stages backpressure.
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=8):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        self.next_stage = None
+
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # time spent waiting on a full downstream queue
+        self.max_depth = 0
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        self.queue.put(job)
+        depth = self.queue.qsize()
+        with self._lock:
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def snapshot(self):
+        """Return the stage counters as a plain dict"""
+        with self._lock:
+            elapsed = time.time() - self._started_at if self._started_at else 0.0
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'retried': self.retried,
+                'queue_depth': self.queue.qsize(),
+                'queue_size': self.queue_size,
+                'max_queue_depth': self.max_depth,
+                'busy_seconds': round(self.busy_seconds, 1),
+                'blocked_seconds': round(self.blocked_seconds, 1),
+                'utilization': round(self.busy_seconds / (elapsed * self.workers), 2) if elapsed else 0.0,
+                'per_minute': round(self.processed / elapsed * 60, 2) if elapsed else 0.0,
+            }
+
+
+class RetryLater:
+    """Returned by a stage handler to run a job through a stage again after a delay"""
+
+    def __init__(self, job, delay, stage=None):
+        self.job = job
+        self.delay = delay
+        self.stage = stage  # name of the stage to re-enter; default is the one that returned this
+
+
+class StagedPipeline:
+    """Run jobs through a chain of PipelineStages connected by bounded queues.
+
+    A handler can return RetryLater to park a job; it is put back into the
+    requested stage once its delay has passed. run() only shuts the stages
+    down once no job is queued, running or waiting for a retry.
+    """
+
+    _STOP = object()
+
+    def __init__(self, stages, report_interval=60, on_error=None, on_finish=None):
+        self.stages = stages
+        self.on_error = on_error
+        self.on_finish = on_finish
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+        self.report_interval = report_interval
+        self.abort = threading.Event()
+        self._threads = {}
+        self._by_name = {stage.name: stage for stage in stages}
+        self._retries = []  # heap of (due, seq, stage name, job)
+        self._retry_seq = 0
+        self._active = 0  # jobs fed in that haven't left the pipeline yet
+        self._cond = threading.Condition()
+
+    def _finish(self, job, report=True):
+        if report and self.on_finish:
+            # The job leaves the pipeline here (done, dropped or failed)
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                print(f"  [pipeline] Error finishing job: {e}")
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _schedule_retry(self, stage, retry):
+        with self._cond:
+            self._retry_seq += 1
+            heapq.heappush(self._retries, (time.time() + retry.delay, self._retry_seq,
+                                           retry.stage or stage.name, retry.job))
+            self._cond.notify_all()
+        with stage._lock:
+            stage.retried += 1
+
+    def _worker(self, stage):
+        while True:
+            job = stage.queue.get()
+            if job is self._STOP:
+                return
+            if self.abort.is_set():
+                self._finish(job, report=False)
+                continue
+
+            start = time.time()
+            try:
+                result = stage.handler(job)
+                ok = True
+            except Exception as e:
+                print(f"  [{stage.name}] Error: {e}")
+                if self.on_error:
+                    self.on_error(stage.name, job, e)
+                result = None
+                ok = False
+            busy = time.time() - start
+
+            with stage._lock:
+                stage.busy_seconds += busy
+                if ok:
+                    stage.processed += 1
+                else:
+                    stage.failed += 1
+
+            if isinstance(result, RetryLater):
+                self._schedule_retry(stage, result)
+            elif result is not None and stage.next_stage is not None:
+                put_start = time.time()
+                stage.next_stage.put(result)
+                with stage._lock:
+                    stage.blocked_seconds += time.time() - put_start
+            else:
+                self._finish(job)
+
+    def _retry_loop(self, done):
+        """Move parked jobs back into their stage once their delay is up"""
+        while True:
+            with self._cond:
+                while not done.is_set() and not (self._retries and self._retries[0][0] <= time.time()):
+                    timeout = self._retries[0][0] - time.time() if self._retries else None
+                    self._cond.wait(timeout)
+                if done.is_set():
+                    return
+                _, _, stage_name, job = heapq.heappop(self._retries)
+            self._by_name[stage_name].put(job)
+
+    def _reporter(self, done):
+        while not done.wait(self.report_interval):
+            print("  [pipeline] " + self.format_status())
+
+    def format_status(self):
+        parts = []
+        for stage in self.stages:
+            snap = stage.snapshot()
+            parts.append(f"{stage.name}: {snap['processed']} done, "
+                         f"queue {snap['queue_depth']}/{snap['queue_size']}, "
+                         f"busy {snap['utilization']:.0%}")
+        with self._cond:
+            if self._retries:
+                parts.append(f"{len(self._retries)} waiting to retry")
+        return " | ".join(parts)
+
+    def run(self, jobs):
+        """Feed jobs into the first stage and block until every stage has drained"""
+        for stage in self.stages:
+            stage._started_at = time.time()
+            self._threads[stage.name] = [
+                threading.Thread(target=self._worker, args=(stage,), daemon=True,
+                                 name=f"{stage.name}-{i}")
+                for i in range(stage.workers)
+            ]
+            for thread in self._threads[stage.name]:
+                thread.start()
+
+        done = threading.Event()
+        reporter = threading.Thread(target=self._reporter, args=(done,), daemon=True)
+        reporter.start()
+        retry_thread = threading.Thread(target=self._retry_loop, args=(done,), daemon=True,
+                                        name="pipeline-retries")
+        retry_thread.start()
+
+        try:
+            for job in jobs:
+                with self._cond:
+                    self._active += 1
+                self.stages[0].put(job)
+
+            # Wait for in-flight jobs, including ones parked for a retry
+            with self._cond:
+                while self._active > 0:
+                    self._cond.wait(timeout=1)
+
+            # Drain stage by stage: a stage can only stop once everything
+            # upstream of it has stopped producing.
+            for stage in self.stages:
+                for _ in range(stage.workers):
+                    stage.queue.put(self._STOP)
+                for thread in self._threads[stage.name]:
+                    while thread.is_alive():
+                        thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.abort.set()
+            raise
+        finally:
+            done.set()
+            with self._cond:
+                self._cond.notify_all()
+
+        return {stage.name: stage.snapshot() for stage in self.stages}
+
+
+class BrowserPool:
+    """Pool of long-lived Selenium drivers.
+
+    Drivers are created lazily up to max_size, checked out for one fetch at a
+    time, and quit/replaced after max_uses pages or whenever a fetch raises
+    (a crashed or wedged browser is never handed out again).
+    """
+
+    def __init__(self, name, factory, max_size=2, max_uses=25):
+        self.name = name
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.max_uses = max_uses
+        self._idle = []  # [driver, pages_served]
+        self._live = 0
+        self._cond = threading.Condition()
+        self.started = 0
+        self.recycled = 0
+
+    @contextmanager
+    def checkout(self):
+        """Context manager yielding a driver; it goes back to the pool on a clean exit"""
+        entry = self._acquire()
+        healthy = False
+        try:
+            yield entry[0]
+            healthy = True
+        finally:
+            self._release(entry, healthy)
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._live < self.max_size:
+                    self._live += 1
+                    break
+                self._cond.wait()
+
+        try:
+            print(f"    Starting {self.name} browser ({self._live}/{self.max_size} in pool)")
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self.started += 1
+        return [driver, 0]
+
+    def _release(self, entry, healthy):
+        entry[1] += 1
+        if healthy and entry[1] < self.max_uses:
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+            return
+
+        self._quit(entry[0])
+        with self._cond:
+            self._live -= 1
+            self.recycled += 1
+            self._cond.notify()
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every idle driver. Drivers still checked out are quit on release."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self.max_uses = 0
+        for driver, _ in idle:
+            self._quit(driver)
+
+
+class FetchMethodStats:
+    """Rolling success rate / latency for one fetch method, with a circuit breaker.
+
+    After failure_threshold consecutive failures the method is tripped out
+    for cooldown seconds; once the cooldown expires it gets tried again.
+    """
+
+    def __init__(self, name, window=20, failure_threshold=3, cooldown=600):
+        self.name = name
+        self.results = deque(maxlen=window)  # (succeeded, seconds)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.attempts = 0
+        self.successes = 0
+        self._lock = threading.Lock()
+
+    def record(self, succeeded, seconds):
+        with self._lock:
+            self.results.append((succeeded, seconds))
+            self.attempts += 1
+            if succeeded:
+                self.successes += 1
+                self.consecutive_failures = 0
+                return
+
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.time() + self.cooldown
+                self.consecutive_failures = 0
+                self.trips += 1
+                print(f"  Circuit open for {self.name}: skipping it for {self.cooldown}s")
+
+    def is_open(self):
+        return time.time() < self.open_until
+
+    def success_rate(self):
+        """Smoothed rolling success rate; an untried method scores 0.5"""
+        with self._lock:
+            wins = sum(1 for ok, _ in self.results if ok)
+            return (wins + 1) / (len(self.results) + 2)
+
+    def avg_latency(self):
+        with self._lock:
+            if not self.results:
+                return 0.0
+            return sum(sec for _, sec in self.results) / len(self.results)
+
+    def snapshot(self):
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'rolling_success_rate': round(self.success_rate(), 2),
+            'rolling_avg_latency': round(self.avg_latency(), 2),
+            'circuit_trips': self.trips,
+            'circuit_open': self.is_open(),
+        }
+
+
+class PageCache:
+    """Compressed on-disk cache of fetched project pages.
+
+    Entries are keyed by the SHA-256 of the normalised project URL and stored
+    as <cache_dir>/<hh>/<hash>.zst (or .gz when zstandard isn't installed).
+    Each entry is a JSON header line (url, project_id, fetched_at) followed by
+    the raw page bytes. Entries fetched more than ttl seconds ago are
+    treated as misses, and once the cache grows past max_bytes the least
+    recently used entries are evicted. A hit refreshes the file's atime for
+    LRU; the TTL always runs from fetched_at, so reading never extends it.
+    """
+
+    EXTENSIONS = ('.zst', '.gz')
+
+    def __init__(self, cache_dir, ttl=30 * 86400, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.has_zstd = not missing_modules(ZSTD_MODULES)
+        self.ext = '.zst' if self.has_zstd else '.gz'
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    @staticmethod
+    def normalize_url(url):
+        parsed = urlparse(url.strip())
+        return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+    def _key(self, url):
+        return hashlib.sha256(self.normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def _entry_paths(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(self.EXTENSIONS):
+                    yield os.path.join(root, name)
+
+    @staticmethod
+    def _compress(data, ext):
+        if ext == '.zst':
+            import zstandard as zstd
+            return zstd.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data, ext):
+        if ext == '.zst':
+            import zstandard as zstd
+            return zstd.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def _read(self, path):
+        """Return (header, content) for an entry file"""
+        ext = os.path.splitext(path)[1]
+        if ext == '.zst' and not self.has_zstd:
+            raise ValueError("zstandard not installed")
+        with open(path, 'rb') as f:
+            raw = self._decompress(f.read(), ext)
+        header, _, content = raw.partition(b'\n')
+        return json.loads(header), content
+
+    @staticmethod
+    def _fetched_at(header, path):
+        """When an entry was fetched, as a timestamp; old entries without one use the file mtime"""
+        if 'fetched_ts' in header:
+            return header['fetched_ts']
+        try:
+            return datetime.fromisoformat(header['fetched_at']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return os.path.getmtime(path)
+
+    def get(self, url):
+        """Return cached page bytes for url, or None on a miss or expired entry"""
+        key = self._key(url)
+        for ext in self.EXTENSIONS:
+            path = self._path(key, ext)
+            try:
+                header, content = self._read(path)
+                if time.time() - self._fetched_at(header, path) > self.ttl:
+                    continue
+                # LRU bookkeeping on atime only; mtime stays the write time
+                os.utime(path, (time.time(), os.path.getmtime(path)))
+            except (OSError, ValueError):
+                continue
+            with self._lock:
+                self.hits += 1
+            return content
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, url, content, project_id=None):
+        key = self._key(url)
+        path = self._path(key, self.ext)
+        header = json.dumps({
+            'url': url,
+            'project_id': project_id,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'fetched_ts': time.time(),
+        }).encode('utf-8')
+        data = self._compress(header + b'\n' + content, self.ext)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.total_bytes += len(data) - old_size
+            over_cap = self.total_bytes > self.max_bytes
+        if over_cap:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is at 90% of max_bytes"""
+        with self._lock:
+            entries = []
+            for path in self._entry_paths():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+            entries.sort()
+
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            evicted = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            self.total_bytes = total
+
+        print(f"  Page cache: evicted {evicted} entries ({total / 1024 ** 2:.0f} MB left)")
+
+    def entries(self):
+        """Yield (header, content) for every readable entry, ignoring TTL"""
+        for path in self._entry_paths():
+            try:
+                yield self._read(path)
+            except (OSError, ValueError) as e:
+                print(f"  Skipping unreadable cache entry {path}: {e}")
+
+
+class ProjectLedger:
+    """Transactional per-project ledger backed by SQLite.
+
+    One row per project id, updated as each pipeline stage finishes, so a
+    crash loses at most the project in flight. Resume, progress reporting and
+    failure analysis all read from here instead of scanning output folders.
+    """
+
+    # Statuses a normal run never needs to revisit
+    FINISHED_STATUSES = ('downloaded', 'converted', 'convert_failed', 'no_video', 'not_found', 'gave_up')
+    # Transient failures: retried with backoff, and by a retry_failed run
+    FAILED_STATUSES = ('scrape_failed', 'download_failed')
+    # Finished without a usable video; these also go to the dead-letter file
+    PERMANENT_STATUSES = ('no_video', 'not_found', 'gave_up')
+
+    COLUMNS = (
+        'url', 'status', 'title', 'video_id', 'video_url', 'video_path', 'video_bytes',
+        'audio_path', 'audio_bytes', 'scrape_seconds', 'download_seconds',
+        'convert_seconds', 'error', 'attempts', 'duplicate_of',
+    )
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS projects (
+                    id TEXT PRIMARY KEY,
+                    url TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    title TEXT,
+                    video_id TEXT,
+                    video_url TEXT,
+                    video_path TEXT,
+                    video_bytes INTEGER,
+                    audio_path TEXT,
+                    audio_bytes INTEGER,
+                    scrape_seconds REAL,
+                    download_seconds REAL,
+                    convert_seconds REAL,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    duplicate_of TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            # Ledgers from before the dedupe index lack duplicate_of
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(projects)")}
+            if 'duplicate_of' not in columns:
+                self._conn.execute("ALTER TABLE projects ADD COLUMN duplicate_of TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status)")
+            # HEAD-probed rendition sizes, so policy decisions never re-probe
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS renditions (
+                    url TEXT PRIMARY KEY,
+                    project_id TEXT,
+                    video_id TEXT,
+                    quality TEXT,
+                    bytes INTEGER,
+                    has_audio INTEGER,
+                    checked_at TEXT NOT NULL
+                )
+            """)
+            # Stored video/audio files by Kickstarter video id, source URL and
+            # content hash, so a relaunched or duplicated project that points
+            # at the same asset can reuse the files instead of downloading again
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS assets (
+                    id INTEGER PRIMARY KEY,
+                    project_id TEXT NOT NULL,
+                    video_id TEXT,
+                    url TEXT,
+                    sha256 TEXT,
+                    bytes INTEGER,
+                    video_path TEXT,
+                    audio_path TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            for column in ('video_id', 'url', 'sha256'):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_assets_{column} ON assets({column})")
+
+    def update(self, project_id, count_attempt=False, **fields):
+        """Insert or update one project's row in a single transaction"""
+        unknown = set(fields) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown ledger columns: {sorted(unknown)}")
+
+        now = datetime.now().isoformat(timespec='seconds')
+        names = list(fields)
+        assignments = [f"{name} = excluded.{name}" for name in names]
+        assignments.append("updated_at = excluded.updated_at")
+        if count_attempt:
+            assignments.append("attempts = projects.attempts + 1")
+
+        sql = (
+            f"INSERT INTO projects (id, {', '.join(names + ['attempts', 'created_at', 'updated_at'])}) "
+            f"VALUES ({', '.join(['?'] * (len(names) + 4))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {', '.join(assignments)}"
+        )
+        values = [str(project_id)] + [fields[name] for name in names] + [1 if count_attempt else 0, now, now]
+        with self._lock, self._conn:
+            self._conn.execute(sql, values)
+
+    def get(self, project_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM projects WHERE id = ?", (str(project_id),)).fetchone()
+        return dict(row) if row else None
+
+    def ids_with_status(self, statuses):
+        """Set of project ids currently in any of the given statuses"""
+        placeholders = ', '.join('?' * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM projects WHERE status IN ({placeholders})", tuple(statuses)).fetchall()
+        return {row['id'] for row in rows}
+
+    def projects_with_status(self, statuses):
+        """Yield {'id', 'url'} for every project in any of the given statuses"""
+        placeholders = ', '.join('?' * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, url FROM projects WHERE status IN ({placeholders}) AND url IS NOT NULL "
+                "ORDER BY rowid", tuple(statuses)).fetchall()
+        for row in rows:
+            yield {'id': row['id'], 'url': row['url']}
+
+    def summary(self):
+        """Project counts by status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM projects GROUP BY status ORDER BY n DESC").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def rendition_size(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT bytes FROM renditions WHERE url = ?", (url,)).fetchone()
+        return row['bytes'] if row else None
+
+    def record_rendition(self, url, size, project_id=None, video_id=None, quality=None, has_audio=True):
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO renditions (url, project_id, video_id, quality, bytes, has_audio, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, None if project_id is None else str(project_id), video_id, quality, size,
+                 1 if has_audio else 0, now))
+
+    def find_assets(self, video_id=None, urls=(), sha256=None):
+        """Stored assets matching the video id, any of the URLs or the content hash, newest first"""
+        clauses, values = [], []
+        if video_id:
+            clauses.append("video_id = ?")
+            values.append(str(video_id))
+        if urls:
+            clauses.append(f"url IN ({', '.join('?' * len(urls))})")
+            values.extend(urls)
+        if sha256:
+            clauses.append("sha256 = ?")
+            values.append(sha256)
+        if not clauses:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM assets WHERE {' OR '.join(clauses)} ORDER BY id DESC", values).fetchall()
+        return [dict(row) for row in rows]
+
+    def record_asset(self, project_id, video_id=None, url=None, sha256=None, size=None,
+                     video_path=None, audio_path=None):
+        """Add a stored asset to the dedupe index; returns its row id"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO assets (project_id, video_id, url, sha256, bytes, video_path, audio_path, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(project_id), None if video_id is None else str(video_id), url, sha256, size,
+                 video_path, audio_path, now))
+            return cursor.lastrowid
+
+    def update_asset(self, asset_id, **fields):
+        """Change the stored paths of an indexed asset"""
+        unknown = set(fields) - {'video_path', 'audio_path'}
+        if unknown:
+            raise ValueError(f"Unknown asset columns: {sorted(unknown)}")
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE assets SET {assignments} WHERE id = ?",
+                               list(fields.values()) + [asset_id])
+
+    def forget_asset(self, asset_id):
+        """Drop an index entry whose files are gone"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM assets WHERE id = ?", (asset_id,))
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM projects LIMIT 1").fetchone() is None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WorkQueue:
+    """Lease-based project queue that several downloader processes can share.
+
+    Projects live in one SQLite table. A worker claims the next project by
+    taking a time-limited lease on it and keeps renewing the lease while the
+    project is in flight. When a worker dies its leases simply expire and
+    the projects become claimable again, so no broker is needed.
+
+    WAL mode is the fast choice on a local disk. SQLite's WAL needs shared
+    memory, so for a queue file on a network share use wal=False, which
+    falls back to the rollback journal and plain file locks.
+    """
+
+    def __init__(self, db_path, worker_id=None, lease_seconds=900, wal=True):
+        self.db_path = db_path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Autocommit mode so claim() can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=60,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    claims INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def add(self, projects, batch_size=500, requeue=False):
+        """Enqueue projects that aren't in the queue yet; returns how many were added.
+
+        With requeue, projects that are in the queue as failed go back to pending.
+        """
+        added = 0
+        batch = []
+
+        def flush():
+            now = datetime.now().isoformat(timespec='seconds')
+            with self._transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT INTO jobs (id, url, updated_at) VALUES (?, ?, ?) ON CONFLICT(id) DO "
+                    + ("UPDATE SET status = 'pending', worker = NULL, lease_expires = NULL, "
+                       "updated_at = excluded.updated_at WHERE jobs.status = 'failed'"
+                       if requeue else "NOTHING"),
+                    [(str(p['id']), p['url'], now) for p in batch])
+                return conn.total_changes - before
+
+        for project in projects:
+            batch.append(project)
+            if len(batch) >= batch_size:
+                added += flush()
+                batch = []
+        if batch:
+            added += flush()
+        return added
+
+    def claim(self):
+        """Lease the next available project for this worker, or None if there is none.
+
+        Expired leases are reclaimed before new projects are started, so
+        work abandoned by a dead worker is picked up first.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, url FROM jobs WHERE status = 'leased' AND lease_expires < ? "
+                "ORDER BY lease_expires LIMIT 1", (now,)).fetchone()
+            if row is None:
+                row = conn.execute(
+                    "SELECT id, url FROM jobs WHERE status = 'pending' ORDER BY rowid LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                "claims = claims + 1, updated_at = ? WHERE id = ?",
+                (self.worker_id, now + self.lease_seconds,
+                 datetime.now().isoformat(timespec='seconds'), row['id']))
+        return {'id': row['id'], 'url': row['url']}
+
+    def renew(self):
+        """Extend every lease this worker holds; returns how many were renewed"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+                (time.time() + self.lease_seconds, self.worker_id))
+            return cursor.rowcount
+
+    def complete(self, project_id, result, failed=False):
+        """Mark a leased project finished. False if the lease was lost to another worker."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND worker = ?",
+                ('failed' if failed else 'done', result, datetime.now().isoformat(timespec='seconds'),
+                 str(project_id), self.worker_id))
+            return cursor.rowcount == 1
+
+    def release(self):
+        """Hand every project this worker still holds back to the queue"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL, lease_expires = NULL "
+                "WHERE status = 'leased' AND worker = ?", (self.worker_id,))
+            return cursor.rowcount
+
+    def summary(self):
+        """Project counts by queue status, with expired leases counted separately"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' "
+                "ELSE status END AS state, COUNT(*) AS n FROM jobs GROUP BY state",
+                (time.time(),)).fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None if it can't be read"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Instrumentation:
+    """Spans around stages, fetch methods and throttle waits for one run.
+
+    Every finished span is appended to a JSONL trace with its latency,
+    bytes and the process's peak RSS. A Prometheus text file with per-span
+    summaries and the run counters is rewritten every refresh_interval
+    seconds. summary() gives p50/p95 per span name. labels (e.g. the
+    worker id) are added to every sample, so several workers' files can sit
+    side by side in one textfile collector.
+
+    With profile_dir set, stage handlers also run under cProfile and
+    tracemalloc is started. The profiles of the profile_top slowest
+    projects, plus the top allocation sites, are written out by stop().
+    """
+
+    def __init__(self, trace_path, metrics_path, refresh_interval=15,
+                 profile_dir=None, profile_top=5, window=10000, labels=None):
+        self.trace_path = trace_path
+        self.metrics_path = metrics_path
+        self.labels = dict(labels or {})
+        self.refresh_interval = refresh_interval
+        self.profile_dir = profile_dir
+        self.profile_top = profile_top
+        self._durations = {}  # span name -> recent latencies
+        self._totals = {}  # span name -> {'count', 'errors', 'seconds', 'bytes'}
+        self._window = window
+        self._lock = threading.Lock()
+        self._trace = None  # opened on the first span
+        self._project_seconds = {}
+        self._profiles = {}  # project id -> [(span name, cProfile.Profile)]
+        self._gauges = None
+        self._done = threading.Event()
+        self._thread = None
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            tracemalloc.start(10)
+
+    @contextmanager
+    def span(self, name, project_id=None, **attrs):
+        """Time a block. The yielded dict takes 'size' (bytes), 'ok' and extra attributes."""
+        record = {'size': 0, 'ok': True}
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record['ok'] = False
+            raise
+        finally:
+            record.update(attrs)
+            self.record(name, time.perf_counter() - start, project_id, **record)
+
+    def record(self, name, seconds, project_id=None, ok=True, size=0, **attrs):
+        """Record a span that was timed elsewhere"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'span': name,
+            'project_id': project_id,
+            'seconds': round(seconds, 4),
+            'ok': ok,
+            'bytes': size or 0,
+            'peak_rss': peak_rss_bytes(),
+        }
+        entry.update(attrs)
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self._window)
+                self._totals[name] = {'count': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0}
+            durations.append(seconds)
+            totals = self._totals[name]
+            totals['count'] += 1
+            totals['errors'] += 0 if ok else 1
+            totals['seconds'] += seconds
+            totals['bytes'] += size or 0
+            if self._trace is None:
+                self._trace = open(self.trace_path, 'a', encoding='utf-8')
+            self._trace.write(line + "\n")
+
+    def call(self, name, project_id, func, *args):
+        """Run func(*args) inside a span, under cProfile when profiling is on"""
+        profiler = None
+        if self.profile_dir:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler; skip this call
+                profiler = None
+        start = time.perf_counter()
+        try:
+            with self.span(name, project_id):
+                return func(*args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._keep_profile(project_id, name, profiler, time.perf_counter() - start)
+
+    def _keep_profile(self, project_id, name, profiler, seconds):
+        with self._lock:
+            self._project_seconds[project_id] = self._project_seconds.get(project_id, 0.0) + seconds
+            self._profiles.setdefault(project_id, []).append((name, profiler))
+            if len(self._profiles) > self.profile_top * 4:
+                # Only the slowest projects' profiles are worth keeping in memory
+                keep = sorted(self._profiles, key=self._project_seconds.get, reverse=True)[:self.profile_top]
+                self._profiles = {pid: self._profiles[pid] for pid in keep}
+
+    def summary(self):
+        """Per-span count, errors, p50/p95/max latency, total seconds and bytes"""
+        with self._lock:
+            snapshot = {name: (sorted(values), dict(self._totals[name]))
+                        for name, values in self._durations.items()}
+        result = {}
+        for name, (values, totals) in sorted(snapshot.items()):
+            result[name] = {
+                'count': totals['count'],
+                'errors': totals['errors'],
+                'p50': round(percentile(values, 0.5), 3),
+                'p95': round(percentile(values, 0.95), 3),
+                'max': round(values[-1], 3),
+                'total_seconds': round(totals['seconds'], 3),
+                'bytes': totals['bytes'],
+            }
+        return result
+
+    def write_metrics(self):
+        """Rewrite the Prometheus text file (atomically, so scrapers never see half of it)"""
+        lines = [
+            "# HELP ks_span_seconds Span latency in seconds",
+            "# TYPE ks_span_seconds summary",
+        ]
+        const = "".join(f',{key}="{val}"' for key, val in self.labels.items())
+        summary = self.summary()
+        for name, snap in summary.items():
+            lines.append(f'ks_span_seconds{{span="{name}"{const},quantile="0.5"}} {snap["p50"]}')
+            lines.append(f'ks_span_seconds{{span="{name}"{const},quantile="0.95"}} {snap["p95"]}')
+            lines.append(f'ks_span_seconds_sum{{span="{name}"{const}}} {snap["total_seconds"]}')
+            lines.append(f'ks_span_seconds_count{{span="{name}"{const}}} {snap["count"]}')
+        lines.append("# TYPE ks_span_errors_total counter")
+        lines.extend(f'ks_span_errors_total{{span="{name}"{const}}} {snap["errors"]}' for name, snap in summary.items())
+        lines.append("# TYPE ks_span_bytes_total counter")
+        lines.extend(f'ks_span_bytes_total{{span="{name}"{const}}} {snap["bytes"]}' for name, snap in summary.items())
+
+        gauges = self._gauges() if self._gauges else []
+        gauges.append(('ks_process_peak_rss_bytes', {}, peak_rss_bytes()))
+        if self.profile_dir:
+            gauges.append(('ks_tracemalloc_peak_bytes', {}, tracemalloc.get_traced_memory()[1]))
+        # The text format wants every sample of a metric next to each other
+        gauges.sort(key=lambda gauge: gauge[0])
+        typed = set()
+        for metric, labels, value in gauges:
+            if value is None:
+                continue
+            if metric not in typed:
+                typed.add(metric)
+                kind = 'counter' if metric.endswith('_total') else 'gauge'
+                lines.append(f"# TYPE {metric} {kind}")
+            label_text = ",".join(f'{key}="{val}"' for key, val in {**labels, **self.labels}.items())
+            lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+
+        tmp_path = f"{self.metrics_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.metrics_path)
+
+    def _refresh(self):
+        while not self._done.wait(self.refresh_interval):
+            with self._lock:
+                if self._trace is not None:
+                    self._trace.flush()
+            try:
+                self.write_metrics()
+            except Exception as e:
+                print(f"  Metrics refresh failed: {e}")
+
+    def start(self, gauges=None):
+        """Start refreshing the metrics file; gauges() returns (metric, labels, value) tuples"""
+        self._gauges = gauges
+        self._done.clear()
+        self._thread = threading.Thread(target=self._refresh, daemon=True, name="metrics")
+        self._thread.start()
+
+    def stop(self):
+        """Final metrics write; dumps profiles of the slowest projects when profiling"""
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+        try:
+            self.write_metrics()
+        except Exception as e:
+            # Runs in process_projects' cleanup; the run summary matters more
+            print(f"  Final metrics write failed: {e}")
+        if self.profile_dir:
+            self._dump_profiles()
+
+    def _dump_profiles(self):
+        with self._lock:
+            slowest = sorted(self._profiles, key=self._project_seconds.get, reverse=True)[:self.profile_top]
+            profiles = {pid: list(self._profiles[pid]) for pid in slowest}
+
+        report_path = os.path.join(self.profile_dir, "slowest_projects.txt")
+        with open(report_path, 'w', encoding='utf-8') as report:
+            for rank, project_id in enumerate(slowest, 1):
+                report.write(f"#{rank} project {project_id}: {self._project_seconds[project_id]:.1f}s in stages\n")
+                for name, profiler in profiles[project_id]:
+                    path = os.path.join(self.profile_dir, f"{rank:02d}_{project_id}_{name}.prof")
+                    profiler.dump_stats(path)
+                    report.write(f"\n--- {name} ({os.path.basename(path)}) ---\n")
+                    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(15)
+                report.write("\n")
+
+            current, peak = tracemalloc.get_traced_memory()
+            report.write(f"tracemalloc: current {current / 1024 ** 2:.1f} MB, peak {peak / 1024 ** 2:.1f} MB\n")
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:20]:
+                report.write(f"  {stat}\n")
+        print(f"Profiles of the {len(slowest)} slowest projects: {report_path}")
 
 
 class AdvancedKickstarterDownloader:
 
-    def __init__(self, csv_file, download_dir="non_disabled_matched_list"):
+    def __init__(self, csv_file, download_dir="non_disabled_matched_list",
+                 page_delay=(15, 30), cdn_interval=0.5, cdn_burst=4,
+                 browser_pool_size=2, browser_max_pages=25,
+                 browser_readiness='project_json', block_browser_resources=True,
+                 readiness_timeout=20, method_failure_threshold=3, method_cooldown=600,
+                 method_probe_every=20, page_cache=True, cache_ttl_days=30,
+                 cache_max_mb=2048, cache_only=False, ledger_path=None,
+                 download_attempts=3, download_segments=4, segment_threshold_mb=16,
+                 min_segment_mb=4, audio_backend='auto', audio_format='mp3',
+                 convert_processes=None, audio_only=False, keep_video=True,
+                 rendition_policy=None, queue_path=None, worker_id=None,
+                 lease_seconds=900, queue_wal=True, adaptive_rate=True,
+                 page_delay_floor=10, page_delay_ceiling=300, rate_step=0.25,
+                 backoff_factor=0.5, max_attempts=4, retry_base_delay=60,
+                 retry_max_delay=1800, http_pool_connections=10, http_pool_maxsize=32,
+                 http_retries=2, metrics_interval=15, profile=False, profile_top=5,
+                 fetch_backends=None, dedupe=True):
         self.download_dir = download_dir
         self.videos_dir = os.path.join(download_dir, "videos")
         self.audio_dir = os.path.join(download_dir, "audio")
@@ -38,19 +1846,165 @@ class AdvancedKickstarterDownloader:
 
         self.csv_file = csv_file
 
-        # Initialize multiple session types
-        self.requests_session = self._create_requests_session()
-        self.cloudscraper_session = cloudscraper.create_scraper()
+        # Audio extraction: 'ffmpeg' drives ffmpeg directly, 'moviepy' keeps the
+        # old decode/re-encode path, 'auto' picks ffmpeg whenever it's found.
+        # audio_format 'mp3' keeps the Whisper notebook's input unchanged;
+        # 'm4a'/'auto' allow a lossless stream copy of AAC tracks.
+        self.audio_format = audio_format
+        if audio_backend != 'auto' and audio_backend not in CONVERT_BACKENDS:
+            raise ValueError(f"Unknown audio_backend {audio_backend!r} "
+                             f"(choose from auto, {', '.join(CONVERT_BACKENDS)})")
+        self.ffmpeg_path = find_ffmpeg() if audio_backend in ('auto', 'ffmpeg') else None
+        if audio_backend == 'ffmpeg' and not self.ffmpeg_path:
+            raise RuntimeError("audio_backend='ffmpeg' but no ffmpeg binary was found")
+        # Which backend conversions actually use; moviepy is imported by the
+        # conversion workers only if we end up here
+        self.audio_backend = 'ffmpeg' if self.ffmpeg_path else 'moviepy'
+        if self.audio_backend == 'moviepy' and missing_modules(CONVERT_BACKENDS['moviepy']):
+            print("Neither ffmpeg nor moviepy is available; audio conversion will fail")
+        # audio_only pipes direct downloads straight into ffmpeg; keep_video
+        # decides whether the MP4 is also written to videos/
+        self.audio_only = audio_only
+        self.keep_video = keep_video
+        if audio_only and not self.ffmpeg_path:
+            print("Audio-only mode needs ffmpeg; videos will be downloaded and converted instead")
+
+        # Which MP4 to download: 'best_video' (high, then base) or
+        # 'smallest_audio' (fewest bytes that still have audio). Audio-only
+        # runs default to the latter.
+        self.rendition_policy = rendition_policy or ('smallest_audio' if audio_only else 'best_video')
+
+        # Conversions run in a process pool sized to the machine, created on first use
+        self.convert_processes = convert_processes or os.cpu_count() or 2
+        self._convert_pool = None
+        # In-process yt-dlp for YouTube/Vimeo videos, created on first use
+        self._ytdlp = None
+
+        # Initialize multiple session types. Each thread gets its own session,
+        # but all sessions of a type share one tuned connection pool.
+        self._sessions = {
+            'requests': SessionPool('requests', self._create_requests_session,
+                                    http_pool_connections, http_pool_maxsize, http_retries),
+            'cloudscraper': SessionPool('cloudscraper', self._create_cloudscraper_session,
+                                        http_pool_connections, http_pool_maxsize, http_retries),
+        }
+
+        # Downloads are indexed by video id, URL and content hash; a project
+        # whose video is already stored gets a hardlink to it instead of a
+        # second download and conversion
+        self.dedupe = dedupe
+
+        # Fetched pages are cached so reruns (or extraction changes) don't
+        # need to go back to the network. cache_only never touches the network.
+        self.page_cache = None
+        if page_cache or cache_only:
+            self.page_cache = PageCache(os.path.join(download_dir, "cache", "pages"),
+                                        ttl=cache_ttl_days * 86400,
+                                        max_bytes=cache_max_mb * 1024 * 1024)
+        self.cache_only = cache_only
+
+        # Per-host rate limiters. Page fetches start at the 15-30s politeness
+        # interval and, with adaptive_rate, speed up while fetches succeed
+        # (never below page_delay_floor) and back off on 403/429/challenges
+        # (up to page_delay_ceiling). CDN downloads get their own, much looser, budget.
+        self.page_delay = page_delay
+        self.adaptive_rate = adaptive_rate
+        self.page_delay_floor = page_delay_floor
+        self.page_delay_ceiling = page_delay_ceiling
+        self.rate_step = rate_step
+        self.backoff_factor = backoff_factor
+        self._rate_log_lock = threading.Lock()
+        # Transient failures are retried in-run with exponential backoff and
+        # jitter; after max_attempts (counted in the ledger across runs) a
+        # project is given up and written to the dead-letter file.
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.dead_letter_path = os.path.join(download_dir, "dead_letter.jsonl")
+        self._dead_letter_lock = threading.Lock()
+        # Why the last fetch on this thread failed, for the scrape stage
+        self._fetch_context = threading.local()
+        self.cdn_interval = cdn_interval
+        self.cdn_burst = cdn_burst
+        self.download_attempts = download_attempts
+        # Files of at least segment_threshold_mb are split into up to
+        # download_segments parallel byte ranges of at least min_segment_mb each
+        self.download_segments = download_segments
+        self.segment_threshold = segment_threshold_mb * 1024 * 1024
+        self.min_segment_size = min_segment_mb * 1024 * 1024
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # Fetch methods in their default (cheapest-first) order, limited to
+        # the enabled backends whose modules are installed. The order
+        # actually used adapts to each method's recent success rate.
+        self._fetch_methods = self._enabled_fetch_methods(fetch_backends)
+        self.method_stats = {
+            method.__name__: FetchMethodStats(method.__name__,
+                                              failure_threshold=method_failure_threshold,
+                                              cooldown=method_cooldown)
+            for method in self._fetch_methods
+        }
+        # Video streams use the enabled HTTP-session backends in the same
+        # order; plain requests stays the last resort since downloads need HTTP
+        enabled = {method.__name__ for method in self._fetch_methods}
+        self._stream_sessions = [name for name, (method_name, _) in FETCH_BACKENDS.items()
+                                 if name in self._sessions and method_name in enabled]
+        if 'requests' not in self._stream_sessions:
+            self._stream_sessions.append('requests')
+        # Every Nth fetch uses the default order so cheap methods that have
+        # started working again get a chance to win back first place.
+        self.method_probe_every = method_probe_every
+        self._fetch_count = 0
+
+        # 'project_json' returns as soon as window.current_project is present;
+        # 'legacy' keeps the fixed sleeps and scrolling.
+        self.browser_readiness = browser_readiness
+        self.block_browser_resources = block_browser_resources
+        self.readiness_timeout = readiness_timeout
+
+        # Browsers are only started if a fetch actually falls back to them,
+        # then reused across projects instead of being launched per URL.
+        self._chrome_pool = BrowserPool('Chrome', self._create_chrome_driver,
+                                        browser_pool_size, browser_max_pages)
+        self._firefox_pool = BrowserPool('Firefox', self._create_firefox_driver,
+                                         browser_pool_size, browser_max_pages)
 
         # Create logging directory
         self.log_dir = os.path.join(download_dir, "logs")
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
 
+        # Per-project ledger: resume state, timings and errors, updated per stage
+        self.ledger = ProjectLedger(ledger_path or os.path.join(download_dir, "ledger.sqlite3"))
+
+        # Shared work queue: several processes/hosts lease projects from one file
+        self.work_queue = None
+        if queue_path:
+            self.work_queue = WorkQueue(queue_path, worker_id=worker_id,
+                                        lease_seconds=lease_seconds, wal=queue_wal)
+
         # Initialize log files
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.download_log = os.path.join(self.log_dir, f"advanced_downloads_{timestamp}.json")
         self.error_log = os.path.join(self.log_dir, f"advanced_errors_{timestamp}.log")
+        self.rate_log = os.path.join(self.log_dir, f"rate_limit_{timestamp}.jsonl")
+
+        # Spans for stages, fetch methods and throttle waits: a JSONL trace, a
+        # Prometheus text file refreshed during runs, and (with profile)
+        # cProfile/tracemalloc output for the slowest projects. Workers
+        # sharing one output folder each get their own metrics file.
+        metrics_name = "metrics.prom"
+        if worker_id:
+            metrics_name = f"metrics_{re.sub(r'[^a-zA-Z0-9_-]', '_', worker_id)}.prom"
+        self.metrics = Instrumentation(
+            os.path.join(self.log_dir, f"trace_{timestamp}.jsonl"),
+            os.path.join(self.log_dir, metrics_name),
+            refresh_interval=metrics_interval,
+            profile_dir=os.path.join(self.log_dir, f"profiles_{timestamp}") if profile else None,
+            profile_top=profile_top, labels={'worker': worker_id} if worker_id else None)
+        self._running_stages = []
 
         self.stats = {
             'total_projects': 0,
@@ -59,9 +2013,28 @@ class AdvancedKickstarterDownloader:
             'videos_downloaded': 0,
             'projects_with_videos': 0,
             'projects_skipped': 0,
+            'rendition_bytes_saved': 0,
+            'retries_scheduled': 0,
+            'session_fallbacks': 0,
+            'ytdlp_results': [],
+            'dead_lettered': 0,
+            'dedupe_reused': 0,
+            'dedupe_hash_matches': 0,
+            'dedupe_bytes_not_downloaded': 0,
+            'dedupe_disk_bytes_saved': 0,
+            'dedupe_conversions_skipped': 0,
+            'manifest_entries': 0,
             'errors': []
         }
 
+    @property
+    def requests_session(self):
+        return self._sessions['requests'].get()
+
+    @property
+    def cloudscraper_session(self):
+        return self._sessions['cloudscraper'].get()
+
     def _create_requests_session(self):
         """Create a sophisticated requests session"""
         session = requests.Session()
@@ -93,31 +2066,178 @@ class AdvancedKickstarterDownloader:
 
         return session
 
-    def fetch_with_multiple_methods(self, url):
+    def _get_limiter(self, url, kind):
+        """Return the token bucket for (kind, host), creating it on first use"""
+        host = urlparse(url).netloc.lower()
+        key = (kind, host)
+        with self._limiters_lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                if kind == 'page' and self.adaptive_rate:
+                    low, high = self.page_delay
+                    limiter = AdaptiveTokenBucket(
+                        (low + high) / 2, self.page_delay_floor, self.page_delay_ceiling,
+                        jitter=(high - low) / (high + low), rate_step=self.rate_step,
+                        backoff_factor=self.backoff_factor)
+                elif kind == 'page':
+                    limiter = TokenBucket(self.page_delay[0], self.page_delay[1])
+                else:
+                    limiter = TokenBucket(self.cdn_interval, capacity=self.cdn_burst)
+                self._limiters[key] = limiter
+        return limiter
+
+    def _wait_for_slot(self, url, kind):
+        """Block until the per-host limiter allows another request"""
+        waited = self._get_limiter(url, kind).acquire()
+        self.metrics.record(f"throttle.{kind}", waited, host=urlparse(url).netloc)
+        if waited > 0:
+            print(f"  Waited {waited:.1f}s for {kind} rate limit ({urlparse(url).netloc})")
+        return waited
+
+    def _report_page_outcome(self, url, block):
+        """Feed one page fetch's outcome to the host's adaptive limiter and the rate log.
+
+        block is (status, retry_after) if any method was pushed back, "ok" if
+        the page came through cleanly, and None when the fetch failed for
+        some other reason, which says nothing about the rate.
+        """
+        limiter = self._get_limiter(url, 'page')
+        if block is None or not isinstance(limiter, AdaptiveTokenBucket):
+            return
+
+        host = urlparse(url).netloc.lower()
+        if block == 'ok':
+            interval = limiter.record_success()
+            event = {'event': 'increase'}
+        else:
+            status, retry_after = block
+            interval = limiter.record_block(retry_after)
+            event = {'event': 'backoff', 'status': status, 'retry_after': retry_after}
+            hold = f", holding {retry_after:.0f}s (Retry-After)" if retry_after else ""
+            print(f"  Pushed back by {host} ({status}): one page every {interval:.1f}s now{hold}")
+
+        event.update({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'host': host,
+            'interval_seconds': round(interval, 2),
+            'rate_per_minute': round(60.0 / interval, 2),
+        })
+        with self._rate_log_lock:
+            with open(self.rate_log, 'a') as f:
+                f.write(json.dumps(event) + "\n")
+
+    def _bump(self, key, amount=1):
+        """Increment a counter in self.stats from any worker thread"""
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def fetch_with_multiple_methods(self, url, project_id=None):
         """
         Try multiple methods to fetch the page, each with different bypass techniques
         """
-        methods = [
-            self._fetch_with_cloudscraper,
-            self._fetch_with_enhanced_requests,
-            self._fetch_with_selenium_stealth,
-            self._fetch_with_headless_firefox
-        ]
+        self._fetch_context.failure = None
+        if self.page_cache:
+            cached = self.page_cache.get(url)
+            if cached is not None:
+                print("  Using cached page")
+                return cached
+        if self.cache_only:
+            print("  Not in page cache (cache-only mode)")
+            self._fetch_context.failure = 'not_cached'
+            return None
+
+        # One page slot per project, however many methods we end up trying
+        self._wait_for_slot(url, 'page')
 
-        for method in methods:
+        # Worst push-back seen during this fetch; drives the adaptive limiter
+        block = None
+        for method in self._ordered_fetch_methods():
+            stats = self.method_stats[method.__name__]
+            start = time.time()
             try:
                 print(f"  Trying method: {method.__name__}")
-                content = method(url)
+                with self.metrics.span(f"fetch.{method.__name__}", project_id) as span:
+                    content = method(url)
+                    span['size'] = len(content) if content else 0
+                    span['ok'] = bool(content) and len(content) > 1000 and not looks_like_challenge(content)
+                if content and looks_like_challenge(content):
+                    stats.record(False, time.time() - start)
+                    print(f"  {method.__name__} got a Cloudflare challenge page")
+                    block = block or ('challenge', None)
+                    continue
                 if content and len(content) > 1000:  # Basic content validation
+                    stats.record(True, time.time() - start)
                     print(f"  Success with {method.__name__}")
+                    self._report_page_outcome(url, block or 'ok')
+                    if self.page_cache:
+                        self.page_cache.put(url, content, project_id)
                     return content
+                stats.record(False, time.time() - start)
             except Exception as e:
+                if error_status(e) in (404, 410):
+                    # The site answered: the project is gone. That's not the
+                    # method's fault, and no other method will find it either.
+                    print(f"  {method.__name__}: project page not found ({error_status(e)})")
+                    self._report_page_outcome(url, block)
+                    self._fetch_context.failure = 'not_found'
+                    return None
+                stats.record(False, time.time() - start)
                 print(f"  {method.__name__} failed: {e}")
+                pushed_back = blocked_response_info(e)
+                if pushed_back and (block is None or (pushed_back[1] or 0) > (block[1] or 0)):
+                    block = pushed_back
                 continue
 
         print("  All methods failed")
+        self._report_page_outcome(url, block)
+        self._fetch_context.failure = 'blocked' if block else 'error'
         return None
 
+    def _ordered_fetch_methods(self):
+        """Fetch methods ordered best-first, with tripped circuits left out"""
+        with self._stats_lock:
+            self._fetch_count += 1
+            probe = self.method_probe_every and self._fetch_count % self.method_probe_every == 0
+
+        methods = [m for m in self._fetch_methods if not self.method_stats[m.__name__].is_open()]
+        if not methods:
+            # Everything is tripped; trying in default order beats giving up
+            return list(self._fetch_methods)
+        if probe:
+            return methods
+
+        def rank(method):
+            stats = self.method_stats[method.__name__]
+            return (-stats.success_rate(), stats.avg_latency())
+
+        # sorted() is stable, so ties keep the cheapest-first default order
+        return sorted(methods, key=rank)
+
+    def _enabled_fetch_methods(self, names):
+        """Bound fetch methods for the named backends (all of FETCH_BACKENDS when None)"""
+        names = list(FETCH_BACKENDS) if names is None else list(names)
+        unknown = [name for name in names if name not in FETCH_BACKENDS]
+        if unknown:
+            raise ValueError(f"Unknown fetch backend(s): {', '.join(unknown)} "
+                             f"(choose from {', '.join(FETCH_BACKENDS)})")
+
+        methods = []
+        for name in names:
+            method_name, modules = FETCH_BACKENDS[name]
+            missing = missing_modules(modules)
+            if missing:
+                print(f"Fetch backend '{name}' disabled: {', '.join(missing)} not installed")
+                continue
+            methods.append(getattr(self, method_name))
+        if not methods:
+            raise RuntimeError("No fetch backend is available")
+        return methods
+
+    def _create_cloudscraper_session(self):
+        """New cloudscraper session; cloudscraper is imported on first use"""
+        import cloudscraper
+        return cloudscraper.create_scraper()
+
     def _fetch_with_cloudscraper(self, url):
         """Use cloudscraper to bypass Cloudflare protection"""
         response = self.cloudscraper_session.get(url, timeout=30)
@@ -142,205 +2262,447 @@ class AdvancedKickstarterDownloader:
         response.raise_for_status()
         return response.content
 
-    def _fetch_with_selenium_stealth(self, url):
-        """Use Selenium with maximum stealth options - JavaScript ENABLED"""
-        driver = None
-        try:
-            options = uc.ChromeOptions()
-            options.add_argument('--headless=new')  # Use new headless mode
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--disable-extensions')
-            # REMOVED --disable-images to help with content loading
-            options.add_argument('--disable-web-security')
-            options.add_argument('--allow-running-insecure-content')
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            # JavaScript is ENABLED by default - don't disable it!
-
-            driver = uc.Chrome(options=options, version_main=None)
-            driver.set_window_size(1920, 1080)
+    def _create_chrome_driver(self):
+        """Start an undetected Chrome instance with maximum stealth options - JavaScript ENABLED"""
+        import undetected_chromedriver as uc
 
-            # Execute stealth scripts
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
+        options = uc.ChromeOptions()
+        options.add_argument('--headless=new')  # Use new headless mode
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('--disable-extensions')
+        # REMOVED --disable-images to help with content loading
+        options.add_argument('--disable-web-security')
+        options.add_argument('--allow-running-insecure-content')
+        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        # JavaScript is ENABLED by default - don't disable it!
+        if self.browser_readiness == 'project_json':
+            # get() returns at DOMContentLoaded; we poll for the project JSON ourselves
+            options.page_load_strategy = 'eager'
 
-            driver.get(url)
+        driver = uc.Chrome(options=options, version_main=None)
+        driver.set_window_size(1920, 1080)
 
-            # Wait for initial page load
-            time.sleep(5)
+        if self.block_browser_resources:
+            # Blocked at the DevTools protocol level, so the requests are never sent
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_BROWSER_URLS})
 
-            # Try to accept cookies if present
-            try:
-                cookie_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'accept')]")
-                if cookie_buttons:
-                    cookie_buttons[0].click()
-                    time.sleep(1)
-            except:
-                pass
+        return driver
 
-            # Scroll to load content and trigger lazy loading
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            for i in range(10):
-                driver.execute_script("window.scrollBy(0, 800);")
-                time.sleep(1)
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+    def _create_firefox_driver(self):
+        """Start a headless Firefox instance - JavaScript ENABLED"""
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
 
-            # Wait for video elements to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: len(d.find_elements(By.TAG_NAME, "video")) > 0 or
-                              len(d.find_elements(By.TAG_NAME, "iframe")) > 0
+        options = FirefoxOptions()
+        options.add_argument('--headless')
+        options.set_preference("dom.webdriver.enabled", False)
+        options.set_preference('useAutomationExtension', False)
+        options.set_preference("general.useragent.override",
+                             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0")
+        # JavaScript is enabled by default
+        if self.browser_readiness == 'project_json':
+            options.page_load_strategy = 'eager'
+
+        if self.block_browser_resources:
+            # Firefox has no CDP URL blocking; use its content preferences instead
+            options.set_preference('permissions.default.image', 2)
+            options.set_preference('gfx.downloadable_fonts.enabled', False)
+            options.set_preference('media.autoplay.default', 5)
+            options.set_preference('media.preload.default', 0)
+            options.set_preference('privacy.trackingprotection.enabled', True)
+
+        driver = webdriver.Firefox(options=options)
+        driver.set_window_size(1920, 1080)
+        return driver
+
+    def _wait_for_project_json(self, driver):
+        """Poll until window.current_project exists. Returns False on timeout."""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+
+        try:
+            WebDriverWait(driver, self.readiness_timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(
+                    "return typeof window.current_project !== 'undefined' && !!window.current_project"
                 )
-            except TimeoutException:
-                print("    No video elements detected, but continuing...")
+            )
+            return True
+        except TimeoutException:
+            return False
 
-            # Additional wait for AJAX/dynamic content
-            time.sleep(3)
+    @staticmethod
+    def _navigation_status(driver):
+        """HTTP status of the document the browser is showing, or None if unknown"""
+        return driver.execute_script(
+            "const nav = performance.getEntriesByType('navigation')[0];"
+            "return nav && nav.responseStatus ? nav.responseStatus : null;")
 
-            return driver.page_source.encode('utf-8')
+    def _load_page(self, driver, url, scroll_step, max_scrolls):
+        """Navigate and return (page source, HTTP status) once the page is usable.
 
-        except Exception as e:
-            raise e
-        finally:
-            if driver:
-                driver.quit()
+        In 'project_json' readiness mode this returns as soon as the project
+        JSON is on the page. Otherwise, or if the JSON never shows up (e.g. a
+        challenge page), it falls back to the fixed waits and scrolling. Error
+        statuses return at once, except 403/429/503: a Cloudflare challenge
+        answers with those and only clears after its script reloads the
+        page, so they get the full wait and the status is read again.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
 
-    def _fetch_with_headless_firefox(self, url):
-        """Use Firefox as an alternative browser - JavaScript ENABLED"""
-        from selenium.webdriver.firefox.options import Options as FirefoxOptions
-        from selenium.webdriver.firefox.service import Service as FirefoxService
+        driver.get(url)
+        status = self._navigation_status(driver)
+        if status and status >= 400 and status not in BLOCK_STATUSES:
+            return driver.page_source.encode('utf-8'), status
 
-        driver = None
-        try:
-            options = FirefoxOptions()
-            options.add_argument('--headless')
-            options.set_preference("dom.webdriver.enabled", False)
-            options.set_preference('useAutomationExtension', False)
-            options.set_preference("general.useragent.override",
-                                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0")
-            # JavaScript is enabled by default
-
-            driver = webdriver.Firefox(options=options)
-            driver.set_window_size(1920, 1080)
-            driver.get(url)
+        if self.browser_readiness == 'project_json':
+            if self._wait_for_project_json(driver):
+                return driver.page_source.encode('utf-8'), self._navigation_status(driver)
+            print("    Project JSON not ready, falling back to full page settle...")
+        else:
+            # Wait for initial page load
             time.sleep(5)
 
-            # Try to accept cookies
-            try:
-                cookie_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'accept')]")
-                if cookie_buttons:
-                    cookie_buttons[0].click()
-                    time.sleep(1)
-            except:
-                pass
-
-            # Scroll to load content
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            for i in range(8):
-                driver.execute_script("window.scrollBy(0, 1000);")
+        # Try to accept cookies if present
+        try:
+            cookie_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'accept')]")
+            if cookie_buttons:
+                cookie_buttons[0].click()
                 time.sleep(1)
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+        except:
+            pass
 
-            # Wait for videos
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: len(d.find_elements(By.TAG_NAME, "video")) > 0 or
-                              len(d.find_elements(By.TAG_NAME, "iframe")) > 0
-                )
-            except TimeoutException:
-                pass
+        # Scroll to load content and trigger lazy loading
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        for i in range(max_scrolls):
+            driver.execute_script(f"window.scrollBy(0, {scroll_step});")
+            time.sleep(1)
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
 
-            time.sleep(3)
-            return driver.page_source.encode('utf-8')
+        # Wait for video elements to load
+        try:
+            WebDriverWait(driver, 10).until(
+                lambda d: len(d.find_elements(By.TAG_NAME, "video")) > 0 or
+                          len(d.find_elements(By.TAG_NAME, "iframe")) > 0
+            )
+        except TimeoutException:
+            print("    No video elements detected, but continuing...")
 
-        except Exception as e:
-            raise e
-        finally:
-            if driver:
-                driver.quit()
+        # Additional wait for AJAX/dynamic content
+        time.sleep(3)
+
+        return driver.page_source.encode('utf-8'), self._navigation_status(driver)
+
+    @staticmethod
+    def _checked_browser_page(url, content, status):
+        """Return a browser-fetched page, or raise PageStatusError for an error page.
+
+        Browsers render error pages like any other page, so the document's
+        status decides; error pages must never be parsed or cached. A 403/
+        429/503 only counts as a block if it is still a challenge (or some
+        other page without the project JSON) once the readiness wait is over.
+        Called after the driver is back in its pool, so an error page never
+        costs a working browser.
+        """
+        if not status or status < 400:
+            return content
+        if status in BLOCK_STATUSES and not looks_like_challenge(content) and PROJECT_JSON_MARKER in content:
+            # The challenge cleared without a reload; the project page is here
+            return content
+        raise PageStatusError(url, status)
+
+    def _fetch_with_selenium_stealth(self, url):
+        """Use a pooled stealth Chrome instance - JavaScript ENABLED"""
+        with self._chrome_pool.checkout() as driver:
+            # Execute stealth scripts
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
+
+            content, status = self._load_page(driver, url, scroll_step=800, max_scrolls=10)
+        return self._checked_browser_page(url, content, status)
+
+    def _fetch_with_headless_firefox(self, url):
+        """Use a pooled Firefox instance as an alternative browser - JavaScript ENABLED"""
+        with self._firefox_pool.checkout() as driver:
+            content, status = self._load_page(driver, url, scroll_step=1000, max_scrolls=8)
+        return self._checked_browser_page(url, content, status)
+
+    def close(self):
+        """Shut down pooled browsers, the conversion process pool and yt-dlp"""
+        for pool in (self._chrome_pool, self._firefox_pool):
+            if pool.started:
+                print(f"  {pool.name} pool: {pool.started} browsers started, {pool.recycled} recycled")
+            pool.close()
+        if self._convert_pool is not None:
+            self._convert_pool.shutdown(wait=True, cancel_futures=True)
+            self._convert_pool = None
+        if self._ytdlp is not None:
+            self._ytdlp.close()
+            self._ytdlp = None
 
     def extract_main_video_only(self, soup, project_url):
         """Extract ONLY the main campaign video from the Kickstarter project JSON"""
         videos = []
-        
+
         print("    Looking for main campaign video in page JSON...")
-        
+
         # Find the script tag containing window.current_project
         for script in soup.find_all('script'):
             if script.string and 'window.current_project' in script.string:
                 try:
-                    import html as html_module
-                    
                     script_text = script.string
-                    
+
                     # Find the JSON string
                     start_marker = 'window.current_project = "'
                     start_idx = script_text.find(start_marker)
-                    
+
                     if start_idx == -1:
                         continue
-                    
+
                     start_idx += len(start_marker)
                     end_idx = script_text.find('";', start_idx)
-                    
+
                     if end_idx == -1:
                         continue
-                    
+
                     # Extract the JSON string and decode HTML entities
                     json_str = script_text[start_idx:end_idx]
                     json_str = html_module.unescape(json_str)
-                    
-                    # Instead of parsing the entire JSON (which has issues with escaped quotes),
-                    # just use regex to extract the video URLs directly
-                    
-                    # Look for video object and extract ID
-                    video_id_match = re.search(r'"video":\s*{\s*"id"\s*:\s*(\d+)', json_str)
-                    video_id = video_id_match.group(1) if video_id_match else 'unknown'
-                    
-                    # Extract high quality URL
-                    high_url_match = re.search(r'"high"\s*:\s*"(https://[^"]+\.mp4)"', json_str)
-                    # Extract base quality URL  
-                    base_url_match = re.search(r'"base"\s*:\s*"(https://[^"]+\.mp4)"', json_str)
-                    
-                    if high_url_match:
-                        videos.append({
-                            'type': 'main_campaign_video_high',
-                            'url': high_url_match.group(1),
-                            'quality': 'high',
-                            'video_id': video_id
-                        })
-                        print(f"    Found main campaign video (ID: {video_id})")
-                        print(f"    Video quality: HIGH")
-                    elif base_url_match:
-                        videos.append({
-                            'type': 'main_campaign_video_base',
-                            'url': base_url_match.group(1),
-                            'quality': 'base',
-                            'video_id': video_id
-                        })
-                        print(f"    Found main campaign video (ID: {video_id})")
-                        print(f"    Video quality: BASE")
-                    else:
-                        print("    No video URLs found in project data")
-                    
+
+                    videos = self._videos_from_project_json(json_str)
+
                     # Once we find window.current_project, we're done
                     break
-                    
+
                 except Exception as e:
                     print(f"    Error extracting video: {e}")
-        
+
         if not videos:
             print("    No main campaign video found")
-        
+
+        return videos
+
+    def _videos_from_project_json(self, json_str):
+        """Pick the main video out of (already unescaped) project JSON text.
+
+        Returns a one-element list (or empty) holding the default choice:
+        the 'high' MP4, else 'base'. Every rendition the JSON exposes is
+        listed under video['renditions'] so _select_rendition() can choose a
+        different one later without re-reading the page.
+        """
+        videos = []
+
+        # Instead of parsing the entire JSON (which has issues with escaped quotes),
+        # just use regex to extract the video URLs directly
+
+        # Look for video object and extract ID
+        video_id_match = re.search(r'"video":\s*{\s*"id"\s*:\s*(\d+)', json_str)
+        video_id = video_id_match.group(1) if video_id_match else 'unknown'
+
+        renditions = []
+        for quality, pattern in (('high', r'https?://[^"]+\.mp4'),
+                                 ('base', r'https?://[^"]+\.mp4'),
+                                 ('hls', r'https?://[^"]+\.m3u8[^"]*')):
+            url_match = re.search(rf'"{quality}"\s*:\s*"({pattern})"', json_str)
+            if not url_match:
+                continue
+            type_match = re.search(rf'"{quality}_type"\s*:\s*"((?:[^"\\]|\\.)*)"', json_str)
+            mime = type_match.group(1).replace('\\"', '"') if type_match else None
+            renditions.append({
+                'quality': quality,
+                'url': url_match.group(1),
+                'mime': mime,
+                # The codecs string tells us about audio; without it, assume there is some
+                'has_audio': ('mp4a' in mime or 'audio' in mime) if mime and 'codecs' in mime else True,
+                'direct': quality != 'hls',
+            })
+
+        direct = [r for r in renditions if r['direct']]
+        if direct:
+            chosen = direct[0]
+            videos.append({
+                'type': f"main_campaign_video_{chosen['quality']}",
+                'url': chosen['url'],
+                'quality': chosen['quality'],
+                'video_id': video_id,
+                'renditions': renditions,
+            })
+            print(f"    Found main campaign video (ID: {video_id})")
+            print(f"    Video quality: {chosen['quality'].upper()}")
+        else:
+            print("    No video URLs found in project data")
+
         return videos
 
+    def _select_rendition(self, video_info, project_id=None):
+        """Apply rendition_policy to a video found by extraction (may probe sizes).
+
+        'best_video' keeps the high -> base preference. 'smallest_audio' picks
+        the smallest direct MP4 that still carries audio, using HEAD sizes
+        cached in the ledger. HLS renditions are recorded but not selected,
+        since the downloader only fetches progressive files.
+        """
+        renditions = [r for r in video_info.get('renditions', []) if r['direct']]
+        if self.rendition_policy != 'smallest_audio' or len(renditions) < 2:
+            return video_info
+
+        candidates = [r for r in renditions if r['has_audio']] or renditions
+        for rendition in candidates:
+            rendition['bytes'] = self._rendition_size(rendition, video_info.get('video_id'), project_id)
+
+        sized = [r for r in candidates if r['bytes']]
+        if not sized:
+            return video_info
+        best = min(sized, key=lambda r: r['bytes'])
+
+        if best['url'] != video_info['url']:
+            current = next((r for r in candidates if r['url'] == video_info['url']), None)
+            saved = (current or {}).get('bytes')
+            print(f"    Rendition policy '{self.rendition_policy}': using {best['quality'].upper()} "
+                  f"({best['bytes'] / 1024 ** 2:.1f} MB"
+                  f"{f' instead of {saved / 1024 ** 2:.1f} MB' if saved else ''})")
+            if saved:
+                self._bump('rendition_bytes_saved', saved - best['bytes'])
+            video_info = dict(video_info, url=best['url'], quality=best['quality'],
+                              type=f"main_campaign_video_{best['quality']}")
+        return video_info
+
+    def _rendition_size(self, rendition, video_id=None, project_id=None):
+        """Size of a rendition in bytes, from the ledger cache or a HEAD probe"""
+        cached = self.ledger.rendition_size(rendition['url'])
+        if cached is not None:
+            return cached
+
+        size = None
+        self._wait_for_slot(rendition['url'], 'cdn')
+        try:
+            response = self.requests_session.head(rendition['url'], allow_redirects=True, timeout=20)
+            if response.ok and response.headers.get('Content-Length'):
+                size = int(response.headers['Content-Length'])
+        except Exception as e:
+            print(f"    HEAD probe failed for {rendition['quality']}: {e}")
+
+        if size:
+            self.ledger.record_rendition(rendition['url'], size, project_id=project_id,
+                                         video_id=video_id, quality=rendition['quality'],
+                                         has_audio=rendition['has_audio'])
+        return size
+
+    def extract_main_video_fast(self, page_content):
+        """Extract title and main video straight from the raw page bytes.
+
+        Skips building a BeautifulSoup tree: finds the window.current_project
+        blob, slices out just the "video" object and unescapes only that.
+        Returns {'title': ..., 'videos': [...]} or None if the page doesn't
+        look the way we expect, in which case the caller should fall back to
+        the BeautifulSoup path.
+        """
+        if isinstance(page_content, str):
+            page_content = page_content.encode('utf-8')
+
+        start_idx = page_content.find(PROJECT_JSON_MARKER)
+        if start_idx == -1:
+            return None
+        start_idx += len(PROJECT_JSON_MARKER)
+        end_idx = page_content.find(b'";', start_idx)
+        if end_idx == -1:
+            return None
+
+        # Only the project's own "video" key counts; rewards and other nested
+        # objects can carry a "video" of their own (often null)
+        obj_start = self._top_level_key(page_content, VIDEO_KEY_RE, start_idx, end_idx)
+        if obj_start == -1:
+            return None
+
+        if page_content.startswith(b'null', obj_start):
+            videos = []
+        elif page_content[obj_start:obj_start + 1] == b'{':
+            obj_end = self._match_brace(page_content, obj_start, end_idx)
+            if obj_end == -1:
+                return None
+            video_json = html_module.unescape(
+                page_content[obj_start:obj_end].decode('utf-8', errors='replace'))
+            try:
+                json.loads(video_json)
+            except ValueError:
+                # Sliced in the wrong place; the full parse will sort it out
+                return None
+            videos = self._videos_from_project_json('"video":' + video_json)
+            if not videos:
+                # Unusual layout: let the full parse have a go
+                return None
+        else:
+            return None
+
+        title = None
+        title_match = H1_RE.search(page_content) or TITLE_RE.search(page_content)
+        if title_match:
+            # Same as BeautifulSoup's get_text(strip=True): strip each text node, then join
+            text = title_match.group(1).decode('utf-8', errors='replace')
+            title = ''.join(html_module.unescape(piece).strip() for piece in TAG_RE.split(text))
+
+        return {'title': title, 'videos': videos}
+
+    @staticmethod
+    def _json_tokens(data, start, limit):
+        """(index, token, depth) for each bracket and key/value string start
+        in HTML-escaped JSON, with depth counted from data[start]; brackets
+        inside strings are skipped"""
+        depth = 0
+        in_string = False
+        for match in JSON_TOKEN_RE.finditer(data, start, limit):
+            idx = match.start()
+            token = match.group()
+            if token == b'&quot;':
+                if in_string:
+                    # A backslash-escaped quote doesn't end the string
+                    backslashes = 0
+                    while data[idx - 1 - backslashes] == 0x5C:  # backslash
+                        backslashes += 1
+                    if backslashes % 2 == 0:
+                        in_string = False
+                    continue
+                in_string = True
+                yield idx, token, depth
+                continue
+            if in_string:
+                continue
+            depth += 1 if token in b'{[' else -1
+            yield idx, token, depth
+            if depth == 0:
+                return
+
+    @classmethod
+    def _top_level_key(cls, data, key_re, start, limit):
+        """Index of the value of a key of the object at data[start], or -1.
+
+        key_re matches the quoted key and the colon; keys of nested objects
+        and string values that happen to look like the key are ignored.
+        """
+        if data[start:start + 1] != b'{':
+            return -1
+        for idx, token, depth in cls._json_tokens(data, start, limit):
+            if token == b'&quot;' and depth == 1:
+                match = key_re.match(data, idx, limit)
+                if match:
+                    return match.end()
+        return -1
+
+    @classmethod
+    def _match_brace(cls, data, open_idx, limit):
+        """Index just past the brace that closes data[open_idx], or -1"""
+        for idx, token, depth in cls._json_tokens(data, open_idx, limit):
+            if depth == 0:
+                return idx + 1
+        return -1
+
     def _extract_from_json(self, data, videos, project_url):
         """Extract videos from JSON data structures"""
         if isinstance(data, dict):
@@ -366,65 +2728,200 @@ class AdvancedKickstarterDownloader:
                 seen_urls.add(url)
         return unique_videos
 
+    def iter_projects(self, shard=None, offset=0, limit=None):
+        """Lazily yield projects from the CSV, one row at a time.
+
+        Rows are deduplicated by id and by URL as they stream past. With
+        shard=(i, n) only projects whose hashed id falls in shard i are kept,
+        so n machines can split one list without precomputing anything.
+        offset/limit count projects after dedupe and sharding.
+        """
+        seen_ids = set()
+        seen_urls = set()
+        kept = 0
+        duplicates = 0
+
+        with open(self.csv_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Handle both lowercase and capitalized column names
+                project_id = (row.get('id') or row.get('ID') or '').strip()
+                project_url = (row.get('url') or row.get('Url') or '').strip()
+                if not project_id or not project_url:
+                    continue
+
+                url_key = project_url.split('?', 1)[0].rstrip('/').lower()
+                if project_id in seen_ids or url_key in seen_urls:
+                    duplicates += 1
+                    continue
+                seen_ids.add(project_id)
+                seen_urls.add(url_key)
+
+                if shard and shard_of(project_id, shard[1]) != shard[0]:
+                    continue
+
+                kept += 1
+                if kept <= offset:
+                    continue
+                if limit is not None and kept > offset + limit:
+                    break
+
+                yield {'id': project_id, 'url': project_url}
+
+        if duplicates:
+            print(f"  Skipped {duplicates} duplicate CSV rows (same id or URL)")
+
+    def iter_retryable(self, shard=None, offset=0, limit=None):
+        """Yield the ledger's transiently failed projects, with the same shard/offset/limit rules"""
+        kept = 0
+        for project in self.ledger.projects_with_status(ProjectLedger.FAILED_STATUSES):
+            if shard and shard_of(project['id'], shard[1]) != shard[0]:
+                continue
+            kept += 1
+            if kept <= offset:
+                continue
+            if limit is not None and kept > offset + limit:
+                break
+            yield project
+
+    def iter_manifest(self, manifest_path, shard=None, offset=0, limit=None):
+        """Yield (project, project_info) from a discovery manifest, with the same shard/offset/limit rules.
+
+        A project discovered more than once keeps its first entry.
+        """
+        seen_ids = set()
+        kept = 0
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A discovery run killed mid-write leaves a partial last line
+                    print(f"  Skipping unreadable manifest line {line_no}")
+                    continue
+
+                project_id = str(entry['id'])
+                if project_id in seen_ids or not entry.get('videos'):
+                    continue
+                seen_ids.add(project_id)
+
+                if shard and shard_of(project_id, shard[1]) != shard[0]:
+                    continue
+                kept += 1
+                if kept <= offset:
+                    continue
+                if limit is not None and kept > offset + limit:
+                    break
+
+                project = {'id': project_id, 'url': entry['url']}
+                project_info = {
+                    'id': project_id,
+                    'title': entry['title'],
+                    'safe_title': entry['safe_title'],
+                    'url': entry['url'],
+                    'videos': entry['videos'],
+                }
+                yield project, project_info
+
     def read_csv(self):
         """Read CSV file"""
-        projects = []
         try:
-            with open(self.csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Handle both lowercase and capitalized column names
-                    project_id = row.get('id') or row.get('ID')
-                    project_url = row.get('url') or row.get('Url')
-                    
-                    projects.append({
-                        'id': project_id,
-                        'url': project_url
-                    })
-
-            self.stats['total_projects'] = len(projects)
-            print(f"Loaded {len(projects)} projects from CSV")
-            return projects
-
+            projects = list(self.iter_projects())
         except Exception as e:
             print(f"Error reading CSV: {e}")
             return []
 
+        self.stats['total_projects'] = len(projects)
+        print(f"Loaded {len(projects)} projects from CSV")
+        return projects
+
     def scrape_project(self, project):
         """Scrape a single project using multiple methods"""
         try:
             project_url = project['url']
             print(f"Fetching: {project_url}")
 
-            page_content = self.fetch_with_multiple_methods(project_url)
+            page_content = self.fetch_with_multiple_methods(project_url, project['id'])
 
             if page_content is None:
                 return None
 
+            with self.metrics.span('parse', project['id'], size=len(page_content)) as span:
+                project_info = self.parse_project_page(page_content, project['id'], project_url)
+                span['ok'] = project_info is not None
+            return project_info
+
+        except Exception as e:
+            print(f"Scraping error: {e}")
+            return None
+
+    def parse_project_page(self, page_content, project_id, project_url):
+        """Turn raw page bytes into the project_info dict used by the pipeline"""
+        # Fast path works on the raw bytes; fall back to a full parse if it can't
+        fast = self.extract_main_video_fast(page_content)
+        if fast is not None:
+            project_title = fast['title'] or f"project_{project_id}"
+            videos = fast['videos']
+        else:
+            # BeautifulSoup is only imported for pages the fast path can't handle
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(page_content, 'html.parser')
 
             # Extract title
             title_elem = soup.find('h1') or soup.find('title')
-            project_title = title_elem.get_text(strip=True) if title_elem else f"project_{project['id']}"
-
-            import re
-            safe_title = re.sub(r'[^a-zA-Z0-9_-]', '_', project_title)[:60]
+            project_title = title_elem.get_text(strip=True) if title_elem else f"project_{project_id}"
 
             # Extract ONLY the main campaign video
             videos = self.extract_main_video_only(soup, project_url)
 
-            # Ensure safe_title is used but we will prefix with ID later
-            return {
-                'id': project['id'],
-                'title': project_title,
-                'safe_title': safe_title,
-                'url': project_url,
-                'videos': videos
-            }
+        safe_title = re.sub(r'[^a-zA-Z0-9_-]', '_', project_title)[:60]
 
-        except Exception as e:
-            print(f"Scraping error: {e}")
-            return None
+        # Ensure safe_title is used but we will prefix with ID later
+        return {
+            'id': project_id,
+            'title': project_title,
+            'safe_title': safe_title,
+            'url': project_url,
+            'videos': videos
+        }
+
+    def extract_from_cache(self, output_file=None):
+        """Re-run extraction over every cached page without any network access.
+
+        Writes one JSON line per page (id, url, title, videos) to output_file,
+        by default logs/cache_extract_<timestamp>.jsonl, and returns the results.
+        """
+        if not self.page_cache:
+            print("Page cache is disabled")
+            return []
+
+        if output_file is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = os.path.join(self.log_dir, f"cache_extract_{timestamp}.jsonl")
+
+        results = []
+        with_video = 0
+        start = time.time()
+        with open(output_file, 'w', encoding='utf-8') as out:
+            for header, content in self.page_cache.entries():
+                try:
+                    info = self.parse_project_page(content, header.get('project_id'), header['url'])
+                except Exception as e:
+                    print(f"  Extraction failed for {header.get('url')}: {e}")
+                    continue
+                if info['videos']:
+                    with_video += 1
+                out.write(json.dumps(info) + "\n")
+                results.append(info)
+
+        elapsed = time.time() - start
+        print(f"\nExtracted {len(results)} cached pages in {elapsed:.1f}s "
+              f"({with_video} with a main video)")
+        print(f"Results saved to: {output_file}")
+        return results
 
     def download_video(self, video_info, target_dir, filename_prefix):
         """Download video using appropriate method"""
@@ -435,6 +2932,8 @@ class AdvancedKickstarterDownloader:
             if not os.path.exists(target_dir):
                 os.makedirs(target_dir)
 
+            self._wait_for_slot(video_url, 'cdn')
+
             if 'youtube' in video_url or 'youtu.be' in video_url:
                 return self._download_with_ytdlp(video_url, target_dir, filename_prefix)
             elif 'vimeo' in video_url:
@@ -447,7 +2946,29 @@ class AdvancedKickstarterDownloader:
             return False
 
     def _download_with_ytdlp(self, video_url, target_dir, filename_prefix):
-        """Download with yt-dlp"""
+        """Download with yt-dlp, in-process when the module is installed"""
+        if missing_modules(YTDLP_MODULES):
+            return self._download_with_ytdlp_command(video_url, target_dir, filename_prefix)
+
+        with self._stats_lock:
+            if self._ytdlp is None:
+                self._ytdlp = YtdlpEngine(audio_only=self.audio_only)
+            engine = self._ytdlp
+
+        result = engine.download(video_url, target_dir, filename_prefix)
+        with self._stats_lock:
+            self.stats['ytdlp_results'].append(result)
+
+        if not result['ok']:
+            print(f"    yt-dlp failed: {result['error']}")
+            return False
+        height = f", {result['height']}p" if result['height'] else ""
+        print(f"    yt-dlp: format {result['format_id']} ({result['ext']}{height}), "
+              f"{result['bytes'] / 1024 ** 2:.1f} MB in {result['seconds']}s")
+        return True
+
+    def _download_with_ytdlp_command(self, video_url, target_dir, filename_prefix):
+        """Download with the yt-dlp command (one process per URL)"""
         try:
             output_template = os.path.join(target_dir, f'{filename_prefix}.%(ext)s')
 
@@ -456,7 +2977,7 @@ class AdvancedKickstarterDownloader:
                 '--no-check-certificates',
                 '--ignore-errors',
                 '--quiet',
-                '-f', 'best[height<=720]',
+                '-f', YtdlpEngine.AUDIO_FORMAT if self.audio_only else YtdlpEngine.VIDEO_FORMAT,
                 '-o', output_template,
                 video_url
             ]
@@ -467,188 +2988,1210 @@ class AdvancedKickstarterDownloader:
         except Exception:
             return False
 
-    def _download_direct_enhanced(self, video_url, target_dir, filename_prefix):
-        """Enhanced direct download"""
+    def _download_direct_enhanced(self, video_url, target_dir, filename_prefix, stream_audio=None):
+        """Enhanced direct download.
+
+        Bytes go to <file>.part and the file is only renamed into place once
+        its size matches what the server announced, so a file under the final
+        name is always complete. An interrupted transfer keeps its .part file
+        and is resumed with a Range request, both within this call (up to
+        download_attempts times) and on later runs.
+        """
         try:
             parsed = urlparse(video_url)
             # Use original extension if available, otherwise default to .mp4
             ext = os.path.splitext(parsed.path)[1]
             if not ext:
                 ext = ".mp4"
-            
+
             filename = f"{filename_prefix}{ext}"
             filepath = os.path.join(target_dir, filename)
 
+            if stream_audio is None:
+                stream_audio = self.audio_only
+            if stream_audio and self.ffmpeg_path:
+                return self._stream_audio_direct(video_url, filepath)
+
             if os.path.exists(filepath):
                 return True
 
-            # Try with cloudscraper first
+            part_path = filepath + ".part"
+
+            # Large files from servers that support ranges are fetched in parallel
+            # segments into a preallocated .segpart, which is never a resumable prefix
+            segpart_path = filepath + ".segpart"
+            plan = self._plan_segments(video_url, segpart_path, part_path)
+            if plan is not None:
+                if self._download_segmented(video_url, segpart_path, plan):
+                    os.replace(segpart_path, filepath)
+                    os.remove(self._segment_state_path(segpart_path))
+                    return True
+                return False
+
+            for attempt in range(1, self.download_attempts + 1):
+                try:
+                    if self._download_to_part(video_url, part_path):
+                        os.replace(part_path, filepath)
+                        return True
+                    return False
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                    print(f"    Transfer interrupted at {have / 1024 ** 2:.1f} MB "
+                          f"(attempt {attempt}/{self.download_attempts}): {e}")
+
+            return False
+
+        except Exception as e:
+            print(f"    Direct download error: {e}")
+            return False
+
+    def _stream_audio_direct(self, video_url, video_filepath):
+        """Pipe the HTTP video stream straight into ffmpeg and keep only the audio.
+
+        The response body is fed to ffmpeg's stdin while it downloads, so
+        network time overlaps with encoding and the video never has to be
+        read back from disk. With keep_video the same bytes are also teed
+        into videos/ (via a .part file). Kickstarter MP4s carry AAC audio, so
+        'auto'/'m4a' stream-copy it. If ffmpeg can't work from a pipe (e.g.
+        the MP4 index is at the end of the file) we fall back to a regular
+        download followed by conversion.
+        """
+        stem = os.path.splitext(os.path.basename(video_filepath))[0]
+        existing = existing_audio_path(self.audio_dir, stem)
+        if existing:
+            return True
+
+        ext, _, codec_args = audio_output_plan('aac', self.audio_format)
+        audio_path = os.path.join(self.audio_dir, stem + ext)
+        tmp_path = f"{audio_path}.{os.getpid()}.part"
+        video_part = video_filepath + ".part" if self.keep_video else None
+
+        # -xerror: a demux error (e.g. moov atom at the end) must fail the run,
+        # otherwise ffmpeg exits 0 with an empty output file
+        cmd = [self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-xerror', '-y', '-i', 'pipe:0',
+               '-map', '0:a:0', '-vn', '-sn', '-dn'] + codec_args + ['-f', AUDIO_MUXERS[ext], tmp_path]
+
+        print(f"    Streaming audio only ({self.audio_format}"
+              f"{', keeping video' if self.keep_video else ''})")
+        with tempfile.TemporaryFile() as ffmpeg_log:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=ffmpeg_log)
+            tee = _AudioStreamTee(proc.stdin, open(video_part, 'wb') if video_part else None)
+            expected = None
             try:
-                response = self.cloudscraper_session.get(video_url, timeout=60, stream=True)
-                response.raise_for_status()
-            except:
-                # Fallback to requests
-                response = self.requests_session.get(video_url, timeout=60, stream=True)
+                response = self._open_video_stream(video_url)
+                try:
+                    if response.headers.get('Content-Length'):
+                        expected = int(response.headers['Content-Length'])
+                    self._copy_stream(response, tee)
+                finally:
+                    response.close()
+            except Exception as e:
+                print(f"    Audio stream interrupted: {e}")
+                tee.failed = True
+            finally:
+                tee.close()
+                returncode = proc.wait()
+
+            ffmpeg_log.seek(0)
+            ffmpeg_errors = ffmpeg_log.read().decode('utf-8', errors='replace').strip()
+
+        complete = not tee.failed and (expected is None or tee.written == expected)
+        if video_part and complete:
+            os.replace(video_part, video_filepath)
+        # An incomplete video .part is a valid prefix; the fallback resumes it with Range
+
+        if complete and returncode == 0 and not tee.pipe_broken:
+            os.replace(tmp_path, audio_path)
+            return True
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        reason = ffmpeg_errors.splitlines()[0][:200] if ffmpeg_errors else f"exit {returncode}"
+        print(f"    Piped extraction failed ({reason}), "
+              f"falling back to download + convert")
+
+        return self._download_then_extract(video_url, video_filepath)
+
+    def _download_then_extract(self, video_url, video_filepath):
+        """Fallback for audio-only mode: full download, convert, drop the video unless kept"""
+        target_dir = os.path.dirname(video_filepath)
+        prefix = os.path.splitext(os.path.basename(video_filepath))[0]
+        if not self._download_direct_enhanced(video_url, target_dir, prefix, stream_audio=False):
+            return False
+
+        audio_path = self.convert_to_mp3(video_filepath)
+        if not self.keep_video and os.path.exists(video_filepath):
+            os.remove(video_filepath)
+        return audio_path is not None
+
+    def _open_video_stream(self, video_url, headers=None):
+        """GET video_url as a stream through the enabled session backends, in order"""
+        *fallbacks, last = self._stream_sessions
+        for name in fallbacks:
+            try:
+                response = self._sessions[name].get().get(video_url, timeout=60, stream=True, headers=headers)
                 response.raise_for_status()
+                return response
+            except Exception as e:
+                if getattr(e, 'response', None) is not None and e.response.status_code == 416:
+                    return e.response
+                print(f"    {name} stream failed ({e}); retrying with the next session")
+                self._bump('session_fallbacks')
+
+        response = self._sessions[last].get().get(video_url, timeout=60, stream=True, headers=headers)
+        if response.status_code != 416:
+            response.raise_for_status()
+        return response
+
+    def _download_to_part(self, video_url, part_path):
+        """Fetch (or continue fetching) video_url into part_path.
+
+        Returns True once part_path holds the complete file, False if the
+        result can't be verified. Network errors propagate so the caller can
+        resume from whatever reached disk.
+        """
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={have}-'} if have else None
+
+        response = self._open_video_stream(video_url, headers)
+        try:
+            if response.status_code == 416:
+                # Nothing left to send: the .part file is complete if it matches the total
+                total = self._content_range_total(response.headers.get('Content-Range'))
+                if total is not None and total == have:
+                    return True
+                print("    Server rejected resume range, restarting download")
+                os.remove(part_path)
+                return self._download_to_part(video_url, part_path)
+
+            if have and response.status_code == 206:
+                start = self._content_range_start(response.headers.get('Content-Range'))
+                if start != have:
+                    print("    Server returned an unexpected range, restarting download")
+                    response.close()
+                    os.remove(part_path)
+                    return self._download_to_part(video_url, part_path)
+                print(f"    Resuming download at {have / 1024 ** 2:.1f} MB")
+                mode = 'ab'
+                expected = self._content_range_total(response.headers.get('Content-Range'))
+            else:
+                # Full response (no range requested, or the server ignored it)
+                have = 0
+                mode = 'wb'
+                expected = None
 
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            if expected is None and response.headers.get('Content-Length'):
+                expected = have + int(response.headers['Content-Length'])
+
+            with open(part_path, mode) as f:
+                self._copy_stream(response, f)
+        finally:
+            response.close()
+
+        size = os.path.getsize(part_path)
+        if expected is not None and size != expected:
+            if size < expected:
+                # Connection closed early without an error; treat it like one
+                raise requests.exceptions.ConnectionError(
+                    f"stream ended at {size} of {expected} bytes")
+            print(f"    Size mismatch: got {size} bytes, expected {expected}")
+            os.remove(part_path)
+            return False
+        return size > 0
+
+    def _copy_stream(self, response, f, limit=None, on_progress=None):
+        """Copy a streamed response body into f with an adaptively sized read buffer.
+
+        Starts at 64 KB and doubles (up to 4 MB) while reads return quickly,
+        halving again when a read stalls, so fast links don't pay Python
+        overhead on tiny chunks and slow ones still report progress. Stops
+        after limit bytes if given. Returns the number of bytes written.
+        """
+        chunk_size = 64 * 1024
+        written = 0
+        while limit is None or written < limit:
+            want = chunk_size if limit is None else min(chunk_size, limit - written)
+            read_start = time.monotonic()
+            chunk = response.raw.read(want, decode_content=True)
+            read_seconds = time.monotonic() - read_start
+            if not chunk:
+                break
+            f.write(chunk)
+            written += len(chunk)
+            if on_progress:
+                on_progress(len(chunk))
+
+            if read_seconds < 0.05 and len(chunk) == want:
+                chunk_size = min(chunk_size * 2, 4 * 1024 * 1024)
+            elif read_seconds > 0.5:
+                chunk_size = max(chunk_size // 2, 16 * 1024)
+        return written
+
+    @staticmethod
+    def _segment_state_path(part_path):
+        return part_path + ".segments.json"
+
+    def _plan_segments(self, video_url, segpart_path, part_path):
+        """Decide whether to use the segmented downloader.
+
+        Returns the segment state dict ({'size', 'segments': [[start, end, done], ...]})
+        or None for a single-stream download into part_path. A segmented
+        download lives in its own preallocated segpart_path, mostly zeros
+        until done, so it is only ever resumed through its state file; a
+        segpart without valid state is discarded.
+        """
+        state_path = self._segment_state_path(segpart_path)
+        legacy_state = self._segment_state_path(part_path)
+        if os.path.exists(legacy_state):
+            # Segmented downloads used to share the .part name; move them over
+            if os.path.exists(part_path):
+                os.replace(part_path, segpart_path)
+            os.replace(legacy_state, state_path)
+
+        if os.path.exists(segpart_path):
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+                if os.path.getsize(segpart_path) == state['size']:
+                    return state
+            except (OSError, ValueError, KeyError):
+                pass
+            print("    Discarding a segmented download without usable state")
+            os.remove(segpart_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
 
-            return os.path.exists(filepath) and os.path.getsize(filepath) > 0
+        if self.download_segments <= 1:
+            return None
+        if os.path.exists(part_path):
+            # Partial single-stream download from an earlier run; let that path resume it
+            return None
 
+        # Probe with a one-byte range: a 206 tells us both the size and range support
+        try:
+            response = self._open_video_stream(video_url, {'Range': 'bytes=0-0'})
+            response.close()
         except Exception:
+            return None
+        if response.status_code != 206:
+            return None
+        size = self._content_range_total(response.headers.get('Content-Range'))
+        if not size or size < self.segment_threshold:
+            return None
+
+        count = max(1, min(self.download_segments, size // self.min_segment_size))
+        if count <= 1:
+            return None
+
+        step = size // count
+        segments = []
+        for i in range(count):
+            start = i * step
+            end = size - 1 if i == count - 1 else start + step - 1
+            segments.append([start, end, 0])
+
+        # Preallocate so every segment can write at its own offset
+        with open(segpart_path, 'wb') as f:
+            f.truncate(size)
+
+        state = {'url': video_url, 'size': size, 'segments': segments}
+        self._save_segment_state(segpart_path, state)
+        return state
+
+    def _save_segment_state(self, part_path, state):
+        state_path = self._segment_state_path(part_path)
+        tmp_path = f"{state_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _download_segmented(self, video_url, part_path, state):
+        """Fetch byte ranges in parallel into the preallocated part_path"""
+        size = state['size']
+        segments = state['segments']
+        lock = threading.Lock()
+        last_saved = [time.monotonic()]
+        remaining = sum(end - start + 1 - done for start, end, done in segments)
+        print(f"    Segmented download: {len(segments)} segments, "
+              f"{size / 1024 ** 2:.1f} MB total, {remaining / 1024 ** 2:.1f} MB to go")
+
+        def fetch_segment(segment):
+            start, end, _ = segment
+            for attempt in range(1, self.download_attempts + 1):
+                offset = start + segment[2]
+                if offset > end:
+                    return True
+                try:
+                    response = self._open_video_stream(video_url, {'Range': f'bytes={offset}-{end}'})
+                    try:
+                        if response.status_code != 206 or \
+                                self._content_range_start(response.headers.get('Content-Range')) != offset:
+                            print("    Server stopped honouring ranges mid-download")
+                            return False
+
+                        def progress(n):
+                            with lock:
+                                segment[2] += n
+                                if time.monotonic() - last_saved[0] > 2:
+                                    last_saved[0] = time.monotonic()
+                                    self._save_segment_state(part_path, state)
+
+                        with open(part_path, 'r+b') as f:
+                            f.seek(offset)
+                            self._copy_stream(response, f, limit=end - offset + 1, on_progress=progress)
+                    finally:
+                        response.close()
+
+                    if start + segment[2] > end:
+                        return True
+                    raise requests.exceptions.ConnectionError("segment stream ended early")
+
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    print(f"    Segment {start}-{end} interrupted "
+                          f"(attempt {attempt}/{self.download_attempts}): {e}")
+            return False
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            results = list(executor.map(fetch_segment, segments))
+
+        with lock:
+            self._save_segment_state(part_path, state)
+
+        if not all(results):
             return False
 
+        elapsed = time.time() - start_time
+        print(f"    Segments complete: {remaining / 1024 ** 2:.1f} MB in {elapsed:.1f}s "
+              f"({remaining / 1024 ** 2 / max(elapsed, 0.001):.1f} MB/s)")
+        return os.path.getsize(part_path) == size
+
+    @staticmethod
+    def _content_range_start(content_range):
+        """First byte offset from a 'bytes start-end/total' header"""
+        match = re.match(r'bytes\s+(\d+)-\d+/', content_range or '')
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def _content_range_total(content_range):
+        """Total size from a 'bytes start-end/total' or 'bytes */total' header"""
+        match = re.match(r'bytes\s+(?:\d+-\d+|\*)/(\d+)', content_range or '')
+        return int(match.group(1)) if match else None
+
     def convert_to_mp3(self, video_path):
-        """Convert video to MP3 and return the path to the new audio file"""
+        """Extract the audio track and return the path to the new audio file.
+
+        Uses ffmpeg directly when available (stream copy where the codec
+        allows, see extract_audio), otherwise falls back to moviepy. The work
+        runs in the shared conversion process pool, so pipeline threads never
+        hold the GIL for decoding.
+        """
         try:
             # Create audio filename in audio directory
             filename = os.path.basename(video_path)
-            audio_filename = os.path.splitext(filename)[0] + ".mp3"
-            audio_path = os.path.join(self.audio_dir, audio_filename)
-            
+            stem = os.path.splitext(filename)[0]
+
             # Check if audio already exists
-            if os.path.exists(audio_path):
-                print(f"    Audio file already exists: {audio_filename}")
-                return audio_path
-
-            print(f"    Converting to MP3: {audio_filename}")
-            
-            # Load video and extract audio
-            with VideoFileClip(video_path) as video:
-                if video.audio:
-                    video.audio.write_audiofile(audio_path, logger=None)
-                    return audio_path
-                else:
+            existing = existing_audio_path(self.audio_dir, stem)
+            if existing:
+                print(f"    Audio file already exists: {os.path.basename(existing)}")
+                return existing
+
+            backend = f"ffmpeg, {self.audio_format}" if self.ffmpeg_path else "moviepy, mp3"
+            print(f"    Extracting audio ({backend}): {stem}")
+            result = self._get_convert_pool().submit(
+                convert_video_file, video_path, self.audio_dir, self.audio_format, self.ffmpeg_path
+            ).result()
+
+            if result['error']:
+                if result['audio_path'] is None and result['error'] == 'no audio track':
                     print("    No audio track found in video")
-                    return None
-                    
+                else:
+                    print(f"    Error converting to MP3: {result['error']}")
+                return None
+
+            print(f"    Audio {'stream-copied' if result['mode'] == 'copy' else 'transcoded'}: "
+                  f"{os.path.basename(result['audio_path'])} ({result['seconds']}s)")
+            return result['audio_path']
+
         except Exception as e:
             print(f"    Error converting to MP3: {e}")
             return None
 
-    def process_projects(self, max_projects=None, convert_audio=False):
-        """Process all projects, skipping any already completed ones."""
-        projects = self.read_csv()
+    def _get_convert_pool(self):
+        """Process pool shared by pipeline conversions and backlog runs"""
+        with self._stats_lock:
+            if self._convert_pool is None:
+                # Forking a process that runs download threads can copy locks
+                # held mid-request into the child; forkserver (spawn where it's
+                # unavailable) starts workers clean. convert_video_file and its
+                # arguments are plain module-level picklables for that reason.
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._convert_pool = ProcessPoolExecutor(max_workers=self.convert_processes,
+                                                         mp_context=multiprocessing.get_context(method))
+            return self._convert_pool
 
-        if not projects:
-            return
+    def convert_backlog(self, limit=None):
+        """Convert every video in videos/ that has no audio yet, in parallel.
 
-        # Build the set of already-done IDs once before the loop
-        print("\nScanning output folders for already-processed projects...")
-        completed_ids = self._build_completed_set()
-        skipped_upfront = 0
+        Can run on its own or in a thread next to process_projects(); both
+        share the same process pool. Returns a summary dict.
+        """
+        videos = []
+        with os.scandir(self.videos_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                    continue
+                stem = os.path.splitext(entry.name)[0]
+                if existing_audio_path(self.audio_dir, stem):
+                    continue
+                videos.append(entry.path)
+        videos.sort()
+        if limit:
+            videos = videos[:limit]
 
-        for idx, project in enumerate(projects[:max_projects], 1):
-            project_id = str(project['id'])
+        print(f"\nAudio backlog: {len(videos)} videos without audio, "
+              f"{self.convert_processes} conversion processes")
+        if not videos:
+            return {'videos': 0}
 
-            # --- Fast-skip: no scraping, no waiting ---
-            if project_id in completed_ids:
-                skipped_upfront += 1
-                print(f"[{idx}/{len(projects)}] Skipping project ID {project_id} (already downloaded)")
-                continue
+        pool = self._get_convert_pool()
+        summary = {'videos': len(videos), 'converted': 0, 'stream_copied': 0,
+                   'no_audio': 0, 'failed': 0, 'input_mb': 0.0}
+        start = time.time()
+        last_report = start
+        futures = [
+            pool.submit(convert_video_file, path, self.audio_dir, self.audio_format, self.ffmpeg_path)
+            for path in videos
+        ]
 
-            start_time = time.time()
-            print(f"\n[{idx}/{len(projects)}] Processing project ID: {project['id']}")
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                summary['input_mb'] += result['video_bytes'] / (1024 * 1024)
+                project_id = os.path.basename(result['video_path']).split('_')[0]
 
-            try:
-                project_info = self.scrape_project(project)
+                if result['audio_path']:
+                    summary['converted'] += 1
+                    if result['mode'] == 'copy':
+                        summary['stream_copied'] += 1
+                    if project_id.isdigit():
+                        self.ledger.update(project_id, status='converted', audio_path=result['audio_path'],
+                                           audio_bytes=os.path.getsize(result['audio_path']),
+                                           convert_seconds=result['seconds'], error=None)
+                else:
+                    if result['error'] == 'no audio track':
+                        summary['no_audio'] += 1
+                    else:
+                        summary['failed'] += 1
+                        print(f"  ✗ {os.path.basename(result['video_path'])}: {result['error']}")
+                    if project_id.isdigit():
+                        self.ledger.update(project_id, status='convert_failed',
+                                           convert_seconds=result['seconds'], error=result['error'])
+
+                now = time.time()
+                if now - last_report > 30 or done == len(videos):
+                    last_report = now
+                    elapsed = now - start
+                    print(f"  [audio backlog] {done}/{len(videos)} done, "
+                          f"{done / elapsed:.2f} files/s, {summary['input_mb'] / elapsed:.1f} MB/s of video")
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print("Audio backlog interrupted")
+
+        summary['seconds'] = round(time.time() - start, 1)
+        summary['input_mb'] = round(summary['input_mb'], 1)
+        print(f"Audio backlog finished: {summary['converted']} converted "
+              f"({summary['stream_copied']} stream-copied), {summary['no_audio']} without audio, "
+              f"{summary['failed']} failed in {summary['seconds']}s")
+        with self._stats_lock:
+            self.stats['audio_backlog'] = summary
+        return summary
+
+    def process_projects(self, max_projects=None, convert_audio=False, workers=1,
+                         download_workers=2, convert_workers=None, queue_size=8,
+                         retry_failed=False, convert_backlog=False, shard=None, offset=0,
+                         discover_to=None, manifest=None):
+        """Process all projects, skipping any already completed ones.
+
+        Work runs as a scrape -> download -> convert pipeline. Each stage has
+        its own worker count and a bounded input queue, so a slow download or
+        conversion never holds up the next page fetch (until the queue in
+        front of it fills up). Page fetches still go through the per-host page
+        limiter, so politeness towards kickstarter.com is unchanged.
+
+        The CSV is streamed rather than loaded up front. shard=(i, n) keeps
+        only this machine's slice of the list, and offset/max_projects
+        select a window of it (see iter_projects).
+
+        Projects the ledger has already finished are skipped, and so are
+        recorded scrape/download failures. Transient failures are retried
+        within the run with exponential backoff, up to max_attempts; with
+        retry_failed, only the ledger's retryable failures are processed
+        and the CSV is not read at all.
+
+        Conversions are handed to the shared process pool; convert_workers
+        (default: one per pool process) bounds how many are in flight. With
+        convert_backlog, existing videos without audio are converted in the
+        background while the scraper runs.
+
+        Discovery and transfer can also run separately, e.g. on different
+        machines: with discover_to, only the scrape stage runs and every
+        project with a video is appended to that JSONL manifest (id, url,
+        title and the selected video with its renditions). With manifest,
+        the pages are not fetched at all; the manifest's videos go straight
+        into the download (and convert) stages.
+        """
+        if discover_to and manifest:
+            raise ValueError("discover_to and manifest are separate runs")
+        if manifest:
+            if not os.path.exists(manifest):
+                print(f"Manifest not found: {manifest}")
+                return
+        elif not retry_failed and not os.path.exists(self.csv_file):
+            print(f"CSV file not found: {self.csv_file}")
+            return
+
+        if self.ledger.is_empty():
+            # First run against this output folder: seed the ledger from files on disk
+            print("\nScanning output folders for already-processed projects...")
+            self._import_existing_outputs()
+
+        skip_statuses = ProjectLedger.FINISHED_STATUSES
+        if not retry_failed:
+            skip_statuses += ProjectLedger.FAILED_STATUSES
+        if discover_to:
+            skip_statuses += ('discovered',)
+        completed_ids = self.ledger.ids_with_status(skip_statuses)
+        print(f"  Resume check: {len(completed_ids)} project IDs already handled according to the ledger.")
+        self._print_ledger_summary()
+        if shard:
+            print(f"  Shard {shard[0]}/{shard[1]}: only projects whose id hashes to this shard are processed")
+
+        total = f"{max_projects}" if max_projects is not None else "?"
+        counts = {'read': 0, 'skipped': 0}
+        if manifest:
+            print(f"  Manifest run: videos come from {manifest}; no project pages are fetched")
+            source = self.iter_manifest(manifest, shard, offset, max_projects)
+        elif retry_failed:
+            print("  Retry run: only projects whose last attempt failed transiently are processed")
+            source = self.iter_retryable(shard, offset, max_projects)
+        else:
+            source = self.iter_projects(shard, offset, max_projects)
+
+        def pending():
+            for idx, project in enumerate(source, 1):
+                project_info = None
+                if manifest:
+                    project, project_info = project
+                counts['read'] = idx
+                self._bump('total_projects')
 
-                if not project_info:
-                    self.stats['projects_skipped'] += 1
+                # --- Fast-skip: no scraping, no waiting ---
+                if project['id'] in completed_ids:
+                    counts['skipped'] += 1
+                    print(f"[{idx}/{total}] Skipping project ID {project['id']} (already handled)")
                     continue
 
-                if not project_info['videos']:
-                    print("No main campaign video found")
-                    self.stats['projects_skipped'] += 1
+                job = {
+                    'project': project,
+                    'idx': idx,
+                    'total': total,
+                    'convert_audio': convert_audio,
+                }
+                if project_info:
+                    job.update(self._manifest_job(project, project_info))
+                yield job
+
+        def leased():
+            idx = 0
+            while True:
+                project = self.work_queue.claim()
+                if project is None:
+                    return
+                idx += 1
+                counts['read'] = idx
+                self._bump('total_projects')
+
+                if project['id'] in completed_ids:
+                    counts['skipped'] += 1
+                    print(f"[{idx}/?] Skipping project ID {project['id']} (already handled)")
+                    self.work_queue.complete(project['id'], 'skipped')
                     continue
 
-                self.stats['projects_with_videos'] += 1
-                self.stats['videos_found'] += len(project_info['videos'])
-
-                print(f"Found main campaign video")
-
-                # Download the main video (should only be one)
-                video_info = project_info['videos'][0]
-                print(f"  Downloading: {video_info.get('quality', 'unknown')} quality")
-
-                # Construct filename with ID prefix
-                filename_prefix = f"{project['id']}_{project_info['safe_title']}"
-
-                # Save to videos subdirectory
-                download_success = self.download_video(video_info, self.videos_dir, filename_prefix)
-                
-                if download_success:
-                    self.stats['videos_downloaded'] += 1
-                    print("    ✓ Download successful")
-                    
-                    # Logic to find the downloaded file path
-                    # (We need the exact path for conversion)
-                    potential_extensions = ['.mp4', '.webm', '.mov', '.mkv']
-                    video_path = None
-                    for ext in potential_extensions:
-                        path_check = os.path.join(self.videos_dir, f"{filename_prefix}{ext}")
-                        if os.path.exists(path_check):
-                            video_path = path_check
-                            break
-                    
-                    # Smart Wait Logic: Convert Audio
-                    if convert_audio and video_path:
-                        self.convert_to_mp3(video_path)
-                else:
-                    print("    ✗ Download failed")
-
-                self.stats['processed'] += 1
-
-                # Smart Wait Logic: Calculation
-                elapsed = time.time() - start_time
-                target_delay = 15 + random.random() * 15  # 15-30s target
-                
-                remaining_wait = target_delay - elapsed
-                
-                if remaining_wait > 0:
-                    print(f"\n  Work done in {elapsed:.1f}s. Waiting {remaining_wait:.1f}s to respect rate limits...")
-                    time.sleep(remaining_wait)
-                else:
-                    print(f"\n  Work done in {elapsed:.1f}s. Proceeding immediately (limit satisfied).")
+                yield {
+                    'project': project,
+                    'idx': idx,
+                    'total': '?',
+                    'convert_audio': convert_audio,
+                }
 
-            except KeyboardInterrupt:
-                print("Interrupted by user")
-                break
+        jobs = pending()
+        scrape_queue_size = queue_size
+        heartbeat_done = threading.Event()
+        if self.work_queue and manifest:
+            print("  The work queue only holds project pages; split a manifest with --shard instead")
+        elif self.work_queue:
+            # Every worker seeds the queue; projects already queued are ignored
+            added = self.work_queue.add(
+                (p for p in source if p['id'] not in completed_ids), requeue=retry_failed)
+            print(f"  Work queue {self.work_queue.db_path}: {added} projects added, "
+                  f"worker {self.work_queue.worker_id}, "
+                  + ", ".join(f"{k}={v}" for k, v in sorted(self.work_queue.summary().items())))
+            jobs = leased()
+            # Only lease what the scrapers can start soon, so idle workers can take the rest
+            scrape_queue_size = max(1, workers)
+            threading.Thread(target=self._renew_leases, args=(heartbeat_done,),
+                             daemon=True, name="lease-heartbeat").start()
 
-            except Exception as e:
-                print(f"Error: {e}")
-                self.stats['errors'].append({'project_id': project['id'], 'error': str(e)})
+        use_queue = self.work_queue and not manifest
+        stages = []
+        if not manifest:
+            stages.append(PipelineStage('scrape', self._instrumented('scrape', self._stage_scrape),
+                                        workers, scrape_queue_size))
+        if discover_to:
+            # One writer, so manifest lines never interleave
+            self._manifest_file = open(discover_to, 'a', encoding='utf-8')
+            stages.append(PipelineStage('manifest', self._stage_manifest, 1, queue_size))
+        else:
+            stages.append(PipelineStage('download', self._instrumented('download', self._stage_download),
+                                        download_workers, queue_size))
+        if not discover_to and (convert_audio or self.audio_only):
+            stages.append(PipelineStage('convert', self._instrumented('convert', self._stage_convert),
+                                        convert_workers or self.convert_processes, queue_size))
+        self._running_stages = stages
+        self.metrics.start(self._metric_gauges)
+
+        backlog_thread = None
+        if convert_backlog:
+            backlog_thread = threading.Thread(target=self.convert_backlog, daemon=True, name="audio-backlog")
+            backlog_thread.start()
 
+        print("\nStreaming projects through pipeline: "
+              + ", ".join(f"{st.name} x{st.workers}" for st in stages))
+
+        pipeline = StagedPipeline(stages, on_error=self._record_stage_error,
+                                  on_finish=self._finish_leased_job if use_queue else None)
+        try:
+            self.stats['stages'] = pipeline.run(jobs)
+        except KeyboardInterrupt:
+            print("Interrupted by user")
+            self.stats['stages'] = {st.name: st.snapshot() for st in stages}
+        finally:
+            heartbeat_done.set()
+            if discover_to:
+                self._manifest_file.close()
+            if use_queue:
+                released = self.work_queue.release()
+                if released:
+                    print(f"  Returned {released} unfinished projects to the work queue")
+            if backlog_thread:
+                backlog_thread.join()
+            self.close()
+            self.metrics.stop()
+
+        if manifest:
+            source_name = "manifest"
+        else:
+            source_name = "work queue" if use_queue else ("ledger" if retry_failed else "CSV")
+        print(f"\nRead {counts['read']} projects from {source_name}, {counts['skipped']} already handled")
+        if discover_to:
+            print(f"Manifest: {discover_to} ({self.stats['manifest_entries']} projects with a video added)")
+        if use_queue:
+            self.stats['work_queue'] = self.work_queue.summary()
+            print("  Work queue: " + ", ".join(f"{k}={v}" for k, v in sorted(self.stats['work_queue'].items())))
         self._save_results()
 
-    def _build_completed_set(self):
-        """Scan existing output files and return a set of already-processed project IDs.
-        
-        Files are named {project_id}_{safe_title}.ext so the ID is the part
-        before the first underscore that is a pure digit string.
-        Both videos/ and audio/ directories are checked so even partially
-        converted runs are correctly detected.
+    def _stage_manifest(self, job):
+        """Discovery runs: append the scraped project and its selected video to the manifest"""
+        project = job['project']
+        project_info = job['project_info']
+        entry = {
+            'id': project['id'],
+            'url': project['url'],
+            'title': project_info['title'],
+            'safe_title': project_info['safe_title'],
+            'videos': project_info['videos'],
+            'discovered_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._manifest_file.write(json.dumps(entry) + "\n")
+        self._manifest_file.flush()
+        self._bump('manifest_entries')
+        self.ledger.update(project['id'], status='discovered')
+        return None
+
+    def _manifest_job(self, project, project_info):
+        """Job fields the download stage needs, built from a manifest entry instead of a scrape"""
+        video_info = project_info['videos'][0]
+        if not self.ledger.get(project['id']):
+            # Transfer machines may not share the discovery machine's ledger
+            video_id = video_info.get('video_id')
+            self.ledger.update(project['id'], count_attempt=True, url=project['url'], status='discovered',
+                               title=project_info['title'], video_url=video_info['url'],
+                               video_id=None if video_id == 'unknown' else video_id)
+        return {
+            'project_info': project_info,
+            'filename_prefix': f"{project['id']}_{project_info['safe_title']}",
+            'start_time': time.time(),
+        }
+
+    def _instrumented(self, name, handler):
+        """Wrap a stage handler in a span (and cProfile when profiling)"""
+        def run(job):
+            return self.metrics.call(f"stage.{name}", job['project']['id'], handler, job)
+        return run
+
+    def _metric_gauges(self):
+        """Run counters, page rates and queue depths for the metrics file"""
+        gauges = []
+        with self._stats_lock:
+            for key, value in self.stats.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    gauges.append((f"ks_{key}_total", {}, value))
+        with self._limiters_lock:
+            limiters = list(self._limiters.items())
+        for (kind, host), limiter in limiters:
+            if isinstance(limiter, AdaptiveTokenBucket):
+                gauges.append(('ks_page_rate_per_minute', {'host': host}, round(limiter.rate_per_minute(), 3)))
+        # Connection reuse per session backend and host: a falling reuse
+        # ratio next to the page rate points at keep-alive being lost
+        for backend, pool in self._sessions.items():
+            for host, entry in pool.connection_stats().items():
+                labels = {'backend': backend, 'host': host}
+                gauges.append(('ks_http_requests_total', labels, entry['requests']))
+                gauges.append(('ks_http_connections_total', labels, entry['connections']))
+                gauges.append(('ks_http_reuse_ratio', labels, entry['reuse_ratio']))
+        for stage in self._running_stages:
+            snap = stage.snapshot()
+            gauges.append(('ks_stage_queue_depth', {'stage': stage.name}, snap['queue_depth']))
+            gauges.append(('ks_stage_processed_total', {'stage': stage.name}, snap['processed']))
+        return gauges
+
+    def _renew_leases(self, done):
+        """Heartbeat: keep this worker's leases alive while projects are in flight"""
+        interval = max(1, self.work_queue.lease_seconds / 3)
+        while not done.wait(interval):
+            try:
+                self.work_queue.renew()
+            except sqlite3.Error as e:
+                print(f"  Lease renewal failed: {e}")
+
+    def _finish_leased_job(self, job):
+        """Close the project's lease once it leaves the pipeline, using its ledger status"""
+        project_id = job['project']['id']
+        row = self.ledger.get(project_id)
+        status = row['status'] if row else None
+        failed = status is None or status in ProjectLedger.FAILED_STATUSES or status in ('not_found', 'gave_up')
+        if not self.work_queue.complete(project_id, status or 'error', failed=failed):
+            print(f"  [{project_id}] Lease had expired; another worker may have taken this project")
+
+    def _record_stage_error(self, stage_name, job, error):
+        with self._stats_lock:
+            self.stats['errors'].append({
+                'project_id': job['project']['id'],
+                'stage': stage_name,
+                'error': str(error)
+            })
+
+    def _stage_scrape(self, job):
+        """Pipeline stage 1: fetch the page and pick the main video"""
+        project = job['project']
+        job['start_time'] = time.time()
+        print(f"\n[{job['idx']}/{job['total']}] Processing project ID: {project['id']}")
+
+        project_info = self.scrape_project(project)
+        scrape_seconds = round(time.time() - job['start_time'], 2)
+
+        if not project_info:
+            failure = getattr(self._fetch_context, 'failure', None)
+            if failure == 'not_found':
+                print("Project page not found (404)")
+                self._bump('projects_skipped')
+                self.ledger.update(project['id'], count_attempt=True, url=project['url'],
+                                   status='not_found', scrape_seconds=scrape_seconds,
+                                   error='project page returned 404')
+                self._dead_letter(project, 'not_found', 'project page returned 404')
+                return None
+
+            if failure == 'not_cached':
+                # Nothing a retry could change until the page is in the cache,
+                # and the ledger is left alone so a normal run still fetches it
+                self._bump('projects_skipped')
+                return None
+
+            error = f"page fetch or parse failed ({failure or 'parse'})"
+            # A block (403/429/challenge) is about the host, not this project,
+            # so it never uses up the project's attempts
+            self.ledger.update(project['id'], count_attempt=failure != 'blocked', url=project['url'],
+                               status='scrape_failed', scrape_seconds=scrape_seconds,
+                               error=error)
+            if failure == 'blocked':
+                return self._retry_after_block(job, error)
+            return self._retry_or_give_up(job, error)
+
+        if not project_info['videos']:
+            print("No main campaign video found")
+            self._bump('projects_skipped')
+            self.ledger.update(project['id'], count_attempt=True, url=project['url'],
+                               status='no_video', title=project_info['title'],
+                               scrape_seconds=scrape_seconds, error=None)
+            self._dead_letter(project, 'no_video', 'no main campaign video')
+            return None
+
+        self._bump('projects_with_videos')
+        self._bump('videos_found', len(project_info['videos']))
+
+        print(f"Found main campaign video")
+        video_info = self._select_rendition(project_info['videos'][0], project['id'])
+        project_info['videos'][0] = video_info
+        self.ledger.update(project['id'], count_attempt=True, url=project['url'],
+                           status='scraped', title=project_info['title'],
+                           video_id=video_info.get('video_id'), video_url=video_info['url'],
+                           scrape_seconds=scrape_seconds, error=None)
+
+        job['project_info'] = project_info
+        # Construct filename with ID prefix
+        job['filename_prefix'] = f"{project['id']}_{project_info['safe_title']}"
+        return job
+
+    def _stage_download(self, job):
+        """Pipeline stage 2: download the main video into videos/"""
+        project = job['project']
+
+        # Download the main video (should only be one)
+        video_info = job['project_info']['videos'][0]
+        filename_prefix = job['filename_prefix']
+
+        if self.dedupe:
+            asset = self._reusable_asset(job, video_info)
+            if asset:
+                return self._reuse_asset(job, asset)
+
+        print(f"  [{project['id']}] Downloading: {video_info.get('quality', 'unknown')} quality")
+
+        # Save to videos subdirectory
+        download_start = time.time()
+        download_success = self.download_video(video_info, self.videos_dir, filename_prefix)
+        download_seconds = round(time.time() - download_start, 2)
+        # The scrape counted the first attempt; each download retry counts another
+        job['download_tries'] = job.get('download_tries', 0) + 1
+        retrying = job['download_tries'] > 1
+        if not retrying:
+            self._bump('processed')
+
+        if not download_success:
+            self.metrics.record('download', download_seconds, project['id'], ok=False)
+            print(f"    [{project['id']}] ✗ Download failed")
+            self.ledger.update(project['id'], count_attempt=retrying, status='download_failed',
+                               download_seconds=download_seconds, error='download failed')
+            return self._retry_or_give_up(job, 'download failed')
+
+        self._bump('videos_downloaded')
+        print(f"    [{project['id']}] ✓ Download successful "
+              f"({time.time() - job['start_time']:.1f}s since scrape started)")
+
+        # Logic to find the downloaded file path
+        # (We need the exact path for conversion)
+        video_path = None
+        potential_extensions = ['.mp4', '.webm', '.mov', '.mkv', '.m4a']
+        for ext in potential_extensions:
+            path_check = os.path.join(self.videos_dir, f"{filename_prefix}{ext}")
+            if os.path.exists(path_check):
+                video_path = path_check
+                break
+
+        video_bytes = os.path.getsize(video_path) if video_path else None
+        self.metrics.record('download', download_seconds, project['id'], size=video_bytes or 0)
+        audio_path = existing_audio_path(self.audio_dir, filename_prefix)
+        if audio_path and self.audio_only:
+            # Audio was produced while streaming; nothing left to convert
+            self.ledger.update(project['id'], count_attempt=retrying, status='converted',
+                               video_path=video_path, video_bytes=video_bytes, audio_path=audio_path,
+                               audio_bytes=os.path.getsize(audio_path),
+                               download_seconds=download_seconds, error=None)
+            if self.dedupe:
+                self._index_download(job, video_info, video_path, audio_path)
+            return None
+
+        self.ledger.update(project['id'], count_attempt=retrying, status='downloaded',
+                           video_path=video_path, video_bytes=video_bytes,
+                           download_seconds=download_seconds, error=None)
+
+        want_audio = job['convert_audio'] or self.audio_only
+        if self.dedupe and video_path:
+            twin = self._index_download(job, video_info, video_path)
+            twin_audio = twin and twin['audio_path']
+            if want_audio and twin_audio and os.path.exists(twin_audio):
+                # Same bytes as a video we already converted: reuse its audio too
+                audio_path, _ = link_asset(twin_audio, os.path.join(
+                    self.audio_dir, filename_prefix + os.path.splitext(twin_audio)[1]))
+                self._bump('dedupe_conversions_skipped')
+                self.ledger.update(project['id'], status='converted', audio_path=audio_path,
+                                   audio_bytes=os.path.getsize(audio_path))
+                self.ledger.update_asset(job['asset_id'], audio_path=audio_path)
+                return None
+
+        if not want_audio or not video_path:
+            return None
+
+        job['video_path'] = video_path
+        return job
+
+    def _reusable_asset(self, job, video_info):
+        """An indexed asset with the same video id or URL whose files cover this job, or None"""
+        video_id = video_info.get('video_id')
+        urls = {asset_url_key(video_info['url'])}
+        urls.update(asset_url_key(rendition['url']) for rendition in video_info.get('renditions', []))
+        want_audio = job['convert_audio'] or self.audio_only
+        need_video = not self.audio_only or self.keep_video
+
+        for asset in self.ledger.find_assets(video_id=None if video_id == 'unknown' else video_id,
+                                             urls=sorted(urls)):
+            if asset['project_id'] == str(job['project']['id']):
+                continue
+            video_path, audio_path = asset['video_path'], asset['audio_path']
+            has_video = bool(video_path and os.path.exists(video_path) and
+                             (asset['bytes'] is None or os.path.getsize(video_path) == asset['bytes']))
+            has_audio = bool(audio_path and os.path.exists(audio_path))
+            if not has_video and not has_audio:
+                self.ledger.forget_asset(asset['id'])
+                continue
+            if has_video or (has_audio and want_audio and not need_video):
+                return asset
+        return None
+
+    def _reuse_asset(self, job, asset):
+        """Satisfy the download stage from an indexed asset instead of the network"""
+        project = job['project']
+        video_info = job['project_info']['videos'][0]
+        filename_prefix = job['filename_prefix']
+        want_audio = job['convert_audio'] or self.audio_only
+        retrying = job.get('download_tries', 0) > 0
+        if not retrying:
+            self._bump('processed')
+
+        video_path = audio_path = None
+        how = 'reference'
+        if asset['video_path'] and os.path.exists(asset['video_path']):
+            video_path, how = link_asset(asset['video_path'], os.path.join(
+                self.videos_dir, filename_prefix + os.path.splitext(asset['video_path'])[1]))
+        if want_audio and asset['audio_path'] and os.path.exists(asset['audio_path']):
+            audio_path, audio_how = link_asset(asset['audio_path'], os.path.join(
+                self.audio_dir, filename_prefix + os.path.splitext(asset['audio_path'])[1]))
+            how = how if video_path else audio_how
+            self._bump('dedupe_conversions_skipped')
+
+        print(f"  [{project['id']}] Same video as project {asset['project_id']}; "
+              f"reusing it ({how}) instead of downloading")
+        self._bump('dedupe_reused')
+        self._bump('dedupe_bytes_not_downloaded', asset['bytes'] or 0)
+        self._bump('dedupe_disk_bytes_saved', asset['bytes'] or 0)
+
+        video_bytes = os.path.getsize(video_path) if video_path else None
+        self.ledger.update(project['id'], count_attempt=retrying,
+                           status='converted' if audio_path else 'downloaded',
+                           video_path=video_path, video_bytes=video_bytes, audio_path=audio_path,
+                           audio_bytes=os.path.getsize(audio_path) if audio_path else None,
+                           download_seconds=0, duplicate_of=asset['project_id'], error=None)
+        video_id = video_info.get('video_id')
+        job['asset_id'] = self.ledger.record_asset(
+            project['id'], None if video_id == 'unknown' else video_id, asset_url_key(video_info['url']),
+            asset['sha256'], video_bytes, video_path, audio_path)
+
+        if audio_path or not want_audio or not video_path:
+            return None
+        job['video_path'] = video_path
+        # A referenced file belongs to the other project; never delete it
+        job['shared_video'] = how == 'reference'
+        return job
+
+    def _index_download(self, job, video_info, video_path, audio_path=None):
+        """Add a fresh download to the dedupe index.
+
+        The video is hashed; if an identical file is already stored, the new
+        copy is replaced with a hardlink to it. Returns that stored asset, or None.
+        """
+        project = job['project']
+        sha256 = file_sha256(video_path) if video_path else None
+        video_bytes = os.path.getsize(video_path) if video_path else None
+
+        twin = None
+        if sha256:
+            for asset in self.ledger.find_assets(sha256=sha256):
+                other = asset['video_path']
+                if other and other != video_path and os.path.exists(other) and os.path.getsize(other) == video_bytes:
+                    twin = asset
+                    break
+        if twin:
+            _, how = link_asset(twin['video_path'], video_path)
+            print(f"  [{project['id']}] Same file as project {twin['project_id']}"
+                  + (" (hardlinked)" if how == 'hardlink' else ""))
+            self._bump('dedupe_hash_matches')
+            if how == 'hardlink':
+                self._bump('dedupe_disk_bytes_saved', video_bytes)
+            self.ledger.update(project['id'], duplicate_of=twin['project_id'])
+
+        video_id = video_info.get('video_id')
+        job['asset_id'] = self.ledger.record_asset(
+            project['id'], None if video_id == 'unknown' else video_id, asset_url_key(video_info['url']),
+            sha256, video_bytes, video_path, audio_path)
+        return twin
+
+    def _retry_or_give_up(self, job, error):
+        """Park a transiently failed job for a backoff retry, or give up once out of attempts"""
+        project = job['project']
+        row = self.ledger.get(project['id'])
+        attempts = row['attempts'] if row else 1
+
+        if attempts >= self.max_attempts:
+            print(f"  [{project['id']}] Giving up after {attempts} attempts: {error}")
+            self._bump('projects_skipped')
+            self.ledger.update(project['id'], status='gave_up', error=f"{error} ({attempts} attempts)")
+            self._dead_letter(project, 'gave_up', error, attempts)
+            return None
+
+        # Exponential backoff with +/-50% jitter, so retries don't line up
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        delay *= random.uniform(0.5, 1.5)
+        print(f"  [{project['id']}] {error}; attempt {attempts + 1}/{self.max_attempts} in {delay:.0f}s")
+        self._bump('retries_scheduled')
+        return RetryLater(job, delay)
+
+    def _retry_after_block(self, job, error):
+        """Park a project whose page fetch was blocked until the host has calmed down.
+
+        The host limiter has already backed off, so the retry waits at least
+        one page interval. After max_attempts blocks in this run the project
+        is left as scrape_failed: never given up or dead-lettered, so a later
+        retry_failed run picks it up again.
         """
-        completed = set()
-        dirs_to_scan = [self.videos_dir, self.audio_dir]
+        project = job['project']
+        job['blocked_tries'] = job.get('blocked_tries', 0) + 1
+        if job['blocked_tries'] >= self.max_attempts:
+            print(f"  [{project['id']}] Still blocked after {job['blocked_tries']} tries; "
+                  f"leaving it for a --retry-failed run")
+            self._bump('projects_skipped')
+            return None
+
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (job['blocked_tries'] - 1))
+        delay *= random.uniform(0.5, 1.5)
+        limiter = self._get_limiter(project['url'], 'page')
+        if isinstance(limiter, AdaptiveTokenBucket):
+            delay = max(delay, limiter.snapshot()['interval_seconds'])
+        print(f"  [{project['id']}] {error}; host is pushing back, trying again in {delay:.0f}s")
+        self._bump('retries_scheduled')
+        return RetryLater(job, delay)
+
+    def _dead_letter(self, project, status, reason, attempts=None):
+        """Append a permanently failed project to dead_letter.jsonl"""
+        self._bump('dead_lettered')
+        entry = {
+            'id': project['id'],
+            'url': project['url'],
+            'status': status,
+            'reason': reason,
+            'attempts': attempts,
+            'time': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._dead_letter_lock:
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
 
-        for scan_dir in dirs_to_scan:
+    def _stage_convert(self, job):
+        """Pipeline stage 3: extract the audio track"""
+        project_id = job['project']['id']
+        convert_start = time.time()
+        audio_path = self.convert_to_mp3(job['video_path'])
+        convert_seconds = round(time.time() - convert_start, 2)
+        self.metrics.record('convert', convert_seconds, project_id, ok=audio_path is not None,
+                            size=os.path.getsize(job['video_path']) if os.path.exists(job['video_path']) else 0)
+
+        if audio_path:
+            self.ledger.update(project_id, status='converted', audio_path=audio_path,
+                               audio_bytes=os.path.getsize(audio_path),
+                               convert_seconds=convert_seconds, error=None)
+            if job.get('asset_id'):
+                self.ledger.update_asset(job['asset_id'], audio_path=audio_path)
+            if self.audio_only and not self.keep_video and not job.get('shared_video'):
+                os.remove(job['video_path'])
+                self.ledger.update(project_id, video_path=None)
+                if job.get('asset_id'):
+                    self.ledger.update_asset(job['asset_id'], video_path=None)
+        else:
+            self.ledger.update(project_id, status='convert_failed',
+                               convert_seconds=convert_seconds,
+                               error='no audio track or conversion error')
+        return None
+
+    def _import_existing_outputs(self):
+        """Seed the ledger from files already in videos/ and audio/.
+
+        Files are named {project_id}_{safe_title}.ext so the ID is the part
+        before the first underscore that is a pure digit string. Projects with
+        an audio file are recorded as converted, video-only ones as downloaded.
+        Only finished media counts: partial downloads, segment state, link
+        markers and temp files are skipped.
+        """
+        found = {}
+        scans = ((self.videos_dir, 'downloaded', VIDEO_EXTENSIONS + AUDIO_EXTENSIONS),
+                 (self.audio_dir, 'converted', AUDIO_EXTENSIONS))
+        for scan_dir, status, extensions in scans:
             if not os.path.exists(scan_dir):
                 continue
             for fname in os.listdir(scan_dir):
+                if not fname.lower().endswith(extensions) or not os.path.isfile(os.path.join(scan_dir, fname)):
+                    continue
                 # Extract leading numeric ID from filenames like "83107119_THE_SKUNKWORK_ALBUM.mp4"
                 parts = fname.split('_')
                 if parts and parts[0].isdigit():
-                    completed.add(parts[0])
+                    path = os.path.join(scan_dir, fname)
+                    entry = found.setdefault(parts[0], {})
+                    entry['status'] = status
+                    if status == 'converted':
+                        entry['audio_path'] = path
+                        entry['audio_bytes'] = os.path.getsize(path)
+                    else:
+                        entry['video_path'] = path
+                        entry['video_bytes'] = os.path.getsize(path)
+
+        for project_id, fields in found.items():
+            self.ledger.update(project_id, **fields)
 
-        print(f"  Resume check: {len(completed)} project IDs already found in output folders.")
-        return completed
+        print(f"  Imported {len(found)} already-processed project IDs into the ledger.")
+
+    def _print_ledger_summary(self):
+        summary = self.ledger.summary()
+        if summary:
+            print("  Ledger: " + ", ".join(f"{status}={count}" for status, count in summary.items()))
 
     def _save_results(self):
         """Save final results"""
+        if self.page_cache:
+            self.stats['page_cache'] = {
+                'hits': self.page_cache.hits,
+                'misses': self.page_cache.misses,
+                'size_mb': round(self.page_cache.total_bytes / 1024 ** 2, 1),
+            }
+        self.stats['fetch_methods'] = {
+            name: stats.snapshot() for name, stats in self.method_stats.items()
+        }
+
+        self.stats['ledger'] = self.ledger.summary()
+        self.stats['http_pools'] = {name: pool.connection_stats() for name, pool in self._sessions.items()}
+        self.stats['spans'] = self.metrics.summary()
+        self.stats['peak_rss_mb'] = round((peak_rss_bytes() or 0) / 1024 ** 2, 1)
+        with self._limiters_lock:
+            self.stats['rate_limits'] = {
+                f"{kind}:{host}": limiter.snapshot()
+                for (kind, host), limiter in self._limiters.items()
+                if isinstance(limiter, AdaptiveTokenBucket)
+            }
+
         with open(self.download_log, 'w') as f:
             json.dump(self.stats, f, indent=2)
 
@@ -656,21 +4199,186 @@ class AdvancedKickstarterDownloader:
         print(f"Total processed: {self.stats['processed']}")
         print(f"Videos found: {self.stats['videos_found']}")
         print(f"Videos downloaded: {self.stats['videos_downloaded']}")
+        if self.stats['retries_scheduled'] or self.stats['dead_lettered']:
+            print(f"Retries scheduled: {self.stats['retries_scheduled']}, "
+                  f"dead-lettered: {self.stats['dead_lettered']} ({self.dead_letter_path})")
+        if self.stats['rendition_bytes_saved']:
+            print(f"Saved by rendition choice: {self.stats['rendition_bytes_saved'] / 1024 ** 2:.1f} MB")
+        if self.stats['dedupe_reused'] or self.stats['dedupe_hash_matches']:
+            print(f"Dedupe: {self.stats['dedupe_reused']} videos reused "
+                  f"({self.stats['dedupe_bytes_not_downloaded'] / 1024 ** 2:.1f} MB not downloaded), "
+                  f"{self.stats['dedupe_hash_matches']} identical downloads linked, "
+                  f"{self.stats['dedupe_disk_bytes_saved'] / 1024 ** 2:.1f} MB disk saved, "
+                  f"{self.stats['dedupe_conversions_skipped']} conversions skipped")
+        self._print_ledger_summary()
 
+        print("Fetch methods:")
+        for name, snap in self.stats['fetch_methods'].items():
+            print(f"  {name:<30} {snap['successes']}/{snap['attempts']} ok, "
+                  f"rolling {snap['rolling_success_rate']:.0%} @ {snap['rolling_avg_latency']:.1f}s, "
+                  f"circuit trips={snap['circuit_trips']}")
 
-def main():
-    # Using uncovered_individual_nondisabled_list.csv from E:\temp\uncovered_march
-    csv_file = r"E:\temp\uncovered_march\uncovered_individual_nondisabled_list.csv"
+        print(f"Spans (peak RSS {self.stats['peak_rss_mb']} MB):")
+        for name, snap in self.stats['spans'].items():
+            size = f" {snap['bytes'] / 1024 ** 2:10.1f} MB" if snap['bytes'] else ""
+            print(f"  {name:<40} n={snap['count']:<5} err={snap['errors']:<4} p50={snap['p50']:8.2f}s "
+                  f"p95={snap['p95']:8.2f}s total={snap['total_seconds']:9.1f}s{size}")
 
-    if not os.path.exists(csv_file):
+        for name, hosts in self.stats['http_pools'].items():
+            for host, entry in hosts.items():
+                print(f"  HTTP {name:<12} {host:<32} {entry['requests']} requests over "
+                      f"{entry['connections']} connections (reuse {entry['reuse_ratio']:.0%})")
+
+        for key, snap in self.stats['rate_limits'].items():
+            print(f"  Rate {key}: {snap['rate_per_minute']}/min now (interval {snap['interval_seconds']}s, "
+                  f"range {snap['fastest_interval']}-{snap['slowest_interval']}s), "
+                  f"{snap['blocks']} backoffs, {snap['successes']} clean fetches")
+
+        for name, snap in self.stats.get('stages', {}).items():
+            print(f"  Stage {name:<9} processed={snap['processed']:<5} failed={snap['failed']:<4} "
+                  f"retried={snap.get('retried', 0):<4} "
+                  f"busy={snap['utilization']:.0%} max_queue={snap['max_queue_depth']}/{snap['queue_size']} "
+                  f"blocked={snap['blocked_seconds']}s")
+
+
+CLI_COMMANDS = ('run', 'discover', 'download', 'convert-backlog', 'extract-cache')
+
+
+def load_config(path):
+    """Read a JSON config file.
+
+    Top-level keys are defaults for the command-line options (e.g. "csv",
+    "out", "workers", "convert"); an optional "downloader" object holds
+    AdvancedKickstarterDownloader options such as "page_delay_floor" or
+    "fetch_backends". Command-line flags override the file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return config
+
+
+def build_parser():
+    """Argument parser for the batch CLI, and its subcommand parsers by name"""
+    parser = argparse.ArgumentParser(
+        description="Kickstarter main campaign video downloader",
+        epilog="Without a command, 'run' is assumed.")
+    sub = parser.add_subparsers(dest='command', metavar='command')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default=None,
+                        help="JSON file with option defaults and a \"downloader\" object of downloader settings")
+    common.add_argument('--out', default=None, help="Output directory (videos/, audio/, logs/, ledger)")
+
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--shard', type=parse_shard, default=None,
+                           help="Process only shard i of n (e.g. 0/4), split by hashed project id")
+    selection.add_argument('--offset', type=int, default=0,
+                           help="Skip this many projects (after dedupe and sharding)")
+    selection.add_argument('--limit', type=int, default=None,
+                           help="Process at most this many projects (default: all)")
+    selection.add_argument('--retry-failed', action='store_true',
+                           help="Retry projects whose last attempt failed transiently "
+                                "('run' takes them from the ledger instead of the CSV)")
+    selection.add_argument('--profile', action='store_true',
+                           help="Profile stage handlers (cProfile + tracemalloc) and keep the slowest projects' data")
+
+    pages = argparse.ArgumentParser(add_help=False)
+    pages.add_argument('--csv', default=None, help="Project list with id/url (or ID/Url) columns")
+    pages.add_argument('--workers', type=int, default=2, help="Concurrent page scrapers")
+    pages.add_argument('--queue', default=None,
+                       help="Shared work queue file; workers pointing at the same file split the projects")
+    pages.add_argument('--worker-id', default=None,
+                       help="Name of this worker in the queue (default: hostname-pid)")
+    pages.add_argument('--lease-seconds', type=int, default=900,
+                       help="How long a claimed project stays reserved without a heartbeat")
+    pages.add_argument('--no-queue-wal', action='store_true',
+                       help="Use SQLite's rollback journal for the queue (for network shares)")
+
+    transfer = argparse.ArgumentParser(add_help=False)
+    transfer.add_argument('--download-workers', type=int, default=4, help="Concurrent video downloads")
+    transfer.add_argument('--convert', action='store_true', help="Extract audio from each downloaded video")
+    transfer.add_argument('--convert-backlog', action='store_true',
+                          help="Also convert existing videos without audio in the background")
+
+    run = sub.add_parser('run', parents=[common, selection, pages, transfer],
+                         help="Scrape, download and (with --convert) extract audio in one pipeline")
+    discover = sub.add_parser('discover', parents=[common, selection, pages],
+                              help="Only scrape pages and append the selected videos to a JSONL manifest")
+    discover.add_argument('--manifest', default=None, help="Manifest file to append to")
+    download = sub.add_parser('download', parents=[common, selection, transfer],
+                              help="Download (and convert) the videos listed in a discovery manifest")
+    download.add_argument('--manifest', default=None, help="Manifest written by 'discover'")
+    backlog = sub.add_parser('convert-backlog', parents=[common],
+                             help="Extract audio for every video in the output folder that has none")
+    backlog.add_argument('--limit', type=int, default=None)
+    extract = sub.add_parser('extract-cache', parents=[common],
+                             help="Re-run video extraction over the page cache, offline")
+    extract.add_argument('--output', default=None,
+                         help="JSONL results file (default: logs/cache_extract_<timestamp>.jsonl)")
+    commands = {'run': run, 'discover': discover, 'download': download,
+                'convert-backlog': backlog, 'extract-cache': extract}
+    return parser, commands
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in CLI_COMMANDS + ('-h', '--help'):
+        argv.insert(0, 'run')
+
+    parser, commands = build_parser()
+    args = parser.parse_args(argv)
+    command_parser = commands[args.command]
+
+    # Config values become defaults, so explicit flags still win
+    downloader_options = {}
+    if args.config:
+        try:
+            config = load_config(args.config)
+        except (OSError, ValueError) as e:
+            command_parser.error(f"Could not read config: {e}")
+        downloader_options = config.pop('downloader', {})
+        # One config can serve every command; only keys no command knows are reported
+        known = {action.dest for action in command_parser._actions}
+        any_known = {action.dest for command in commands.values() for action in command._actions}
+        unknown = sorted(key for key in config if key.replace('-', '_') not in any_known)
+        if unknown:
+            print(f"Ignoring unknown config keys: {', '.join(unknown)}")
+        command_parser.set_defaults(**{key.replace('-', '_'): value for key, value in config.items()
+                                       if key.replace('-', '_') in known})
+        args = parser.parse_args(argv)
+
+    if not args.out:
+        command_parser.error("--out is required (or set \"out\" in --config)")
+    csv_file = getattr(args, 'csv', None)
+    if args.command in ('run', 'discover') and not csv_file and not args.retry_failed:
+        command_parser.error("--csv is required (or set \"csv\" in --config)")
+    if args.command in ('discover', 'download') and not args.manifest:
+        command_parser.error(f"'{args.command}' needs --manifest")
+    if csv_file and not os.path.exists(csv_file):
         print(f"CSV file not found: {csv_file}")
-        return
+        return 1
 
-    # Set download directory to E:\temp\uncovered_march\Output
-    download_dir = r"E:\temp\uncovered_march\Output"
-    downloader = AdvancedKickstarterDownloader(csv_file, download_dir=download_dir)
+    queue_path = getattr(args, 'queue', None)
+    if queue_path:
+        downloader_options.update(queue_path=queue_path, worker_id=args.worker_id,
+                                  lease_seconds=args.lease_seconds, queue_wal=not args.no_queue_wal)
+    if getattr(args, 'profile', False):
+        downloader_options['profile'] = True
+    downloader = AdvancedKickstarterDownloader(csv_file, download_dir=args.out, **downloader_options)
+
+    if args.command in ('convert-backlog', 'extract-cache'):
+        try:
+            if args.command == 'convert-backlog':
+                downloader.convert_backlog(limit=args.limit)
+            else:
+                downloader.extract_from_cache(args.output)
+        finally:
+            downloader.close()
+        return 0
 
-    print("==" * 70)
+    print("=" * 70)
     print("KICKSTARTER VIDEO DOWNLOADER")
     print("=" * 70)
     print("Features:")
@@ -679,45 +4387,38 @@ def main():
     print("  - Enhanced Selenium with JavaScript ENABLED")
     print("  - Firefox fallback")
     print("  - Extracts ONLY the main campaign video (not related videos)")
-    print("  - Rate limiting protection (15-30s delays)")
+    print("  - Adaptive rate limiting (starts at 15-30s between page fetches, backs off on 403/429/challenges)")
+    print("  - Staged scrape -> download -> convert pipeline with bounded queues")
     print("=" * 70)
-    print(f"CSV file: {csv_file}")
+    print(f"Command: {args.command}")
+    if csv_file:
+        print(f"CSV file: {csv_file}")
+    if getattr(args, 'manifest', None):
+        print(f"Manifest: {args.manifest}")
     print(f"Download directory: {downloader.download_dir}")
+    if args.shard:
+        print(f"Shard: {args.shard[0]}/{args.shard[1]}")
+    if queue_path:
+        print(f"Work queue: {queue_path} (worker {downloader.work_queue.worker_id})")
+    print(f"Projects: {'all' if args.limit is None else args.limit}"
+          + (f" after skipping {args.offset}" if args.offset else ""))
+    if args.command != 'discover':
+        print(f"Audio extraction: {'ENABLED' if args.convert else 'DISABLED'}")
     print("=" * 70)
 
-    # Ask user how many projects to process
-    try:
-        user_input = input("\nHow many projects to process? (press Enter for 5, or type 'all'): ").strip()
-        if user_input.lower() == 'all':
-            max_projects = None
-            print("Processing ALL projects from CSV...")
-        elif user_input == '':
-            max_projects = 5
-            print("Processing first 5 projects...")
-        else:
-            max_projects = int(user_input)
-            print(f"Processing first {max_projects} projects...")
-    except:
-        max_projects = 5
-        print("Processing first 5 projects (default)...")
-
-    # Ask for audio conversion
-    convert_audio = False
-    try:
-        audio_input = input("\nDo you want to extract audio (MP3) as well? (y/n, default n): ").strip().lower()
-        if audio_input == 'y':
-            convert_audio = True
-            print("Audio extraction ENABLED (uses smart wait logic)")
-        else:
-            print("Audio extraction DISABLED")
-    except:
-        pass
-
-    print("\nStarting in 3 seconds... (Press Ctrl+C to cancel)")
-    time.sleep(3)
-
-    downloader.process_projects(max_projects=max_projects, convert_audio=convert_audio)
+    options = dict(max_projects=args.limit, shard=args.shard, offset=args.offset,
+                   retry_failed=args.retry_failed)
+    if args.command == 'discover':
+        downloader.process_projects(workers=args.workers, discover_to=args.manifest, **options)
+    elif args.command == 'download':
+        downloader.process_projects(convert_audio=args.convert, download_workers=args.download_workers,
+                                    convert_backlog=args.convert_backlog, manifest=args.manifest, **options)
+    else:
+        downloader.process_projects(convert_audio=args.convert, workers=args.workers,
+                                    download_workers=args.download_workers,
+                                    convert_backlog=args.convert_backlog, **options)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file